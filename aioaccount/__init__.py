@@ -1,36 +1,73 @@
-import aiojobs
-
-from typing import AsyncGenerator, Tuple, Union
+import asyncio
+
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union
+)
+from concurrent.futures import Executor
 from databases import Database
 from secrets import token_urlsafe
+from base64 import urlsafe_b64encode, urlsafe_b64decode
 from motor.motor_asyncio import AsyncIOMotorClient
 from password_strength import PasswordPolicy as ExtPP
-from email_validator import validate_email, EmailNotValidError
-from bcrypt import hashpw, gensalt, checkpw
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-from ._engines import SQLEngine, MongoEngine
+from ._engines import SQLEngine, MongoEngine, MemoryEngine
 from ._smtp import SmtpClient, SmtpHtml
 from ._pass_policy import PasswordPolicy
-from ._sql import create_tables, SqlWrapper
+from ._sql import SqlWrapper
 from ._mongo import MongoWrapper
+from ._memory import MemoryWrapper
 from ._errors import (
     AioAccountError,
     AccountDetailsError,
     EmailError,
     DetailsExistError,
     PasswordPolicyError,
+    PasswordBreachedError,
     NameLengthInvalidError,
     InvalidLogin,
+    LoginThrottled,
+    SessionInvalid,
+    SmtpNotStarted,
     UnableToConfirmEmail,
     NameInvalidCharactersError,
     UserIdError,
     PasswordResetInvalid
 )
-from ._util import generate_id
-from ._models import UserModel
+from ._util import generate_id, code_digest, detail_key, detail_keys
+from ._hashers import (
+    Hasher,
+    BcryptHasher,
+    ScryptHasher,
+    Argon2Hasher,
+    identify_hasher
+)
+from ._models import UserModel, AccountResult, UserStats
 from ._user import User
-from ._const import _MAX_NAME_LEN
+from ._cache import UserCache
+from ._bloom import BloomFilter
+from ._outbox import Outbox
+from ._email import EmailValidator
+from ._breach import BreachedPasswords, build_breach_file
+from ._throttle import LoginThrottle
+from ._session import Sessions, _row_counter
+from ._const import (
+    _MAX_NAME_LEN,
+    _MODEL_COLUMNS,
+    _LOGIN_COLUMNS,
+    _BULK_UPDATE_COLUMNS,
+    _BULK_FILTER_COLUMNS
+)
 
 __version__ = "0.0.2"
 __url__ = "https://aioaccount.readthedocs.io/en/latest/"
@@ -44,6 +81,7 @@ __all__ = [
     "AccountHandler",
     "SQLEngine",
     "MongoEngine",
+    "MemoryEngine",
     "SmtpClient",
     "PasswordPolicy",
     "AioAccountError",
@@ -51,34 +89,71 @@ __all__ = [
     "EmailError",
     "DetailsExistError",
     "UserModel",
+    "AccountResult",
+    "Outbox",
+    "EmailValidator",
+    "BreachedPasswords",
+    "build_breach_file",
+    "LoginThrottle",
+    "Sessions",
+    "UserStats",
     "PasswordPolicyError",
+    "PasswordBreachedError",
     "NameLengthInvalidError",
     "UnableToConfirmEmail",
     "NameInvalidCharactersError",
     "UserIdError",
     "PasswordResetInvalid",
     "InvalidLogin",
-    "SmtpHtml"
+    "LoginThrottled",
+    "SessionInvalid",
+    "SmtpNotStarted",
+    "SmtpHtml",
+    "Hasher",
+    "BcryptHasher",
+    "ScryptHasher",
+    "Argon2Hasher",
+    "UserCache",
+    "BloomFilter"
 ]
 
 
 class AccountHandler:
     _smtp: Union[SmtpClient, None]
-    _db: Union[Database, AsyncIOMotorClient]
-    _jobs: aiojobs.Scheduler
+    _db: Union[Database, AsyncIOMotorClient, MemoryWrapper]
     _policy: ExtPP
-    _db_wrapper: Union[SqlWrapper, MongoWrapper]
-
-    def __init__(self, engine: Union[MongoEngine, SQLEngine],
+    _db_wrapper: Union[SqlWrapper, MongoWrapper, MemoryWrapper]
+    _hash_limit: Optional[asyncio.Semaphore]
+    _hasher: Hasher
+    _cache: Optional[UserCache]
+    _taken: Optional[BloomFilter]
+    _breached: Optional[BreachedPasswords]
+    _throttle: Optional[LoginThrottle]
+    _sessions: Optional[Sessions]
+    _outbox: Optional[Outbox]
+
+    def __init__(self, engine: Union[MongoEngine, SQLEngine, MemoryEngine],
                  password_policy: PasswordPolicy = PasswordPolicy(),
                  smtp: SmtpClient = None,
-                 password_reset_expires: timedelta = timedelta(hours=24)
+                 password_reset_expires: timedelta = timedelta(hours=24),
+                 hash_executor: Executor = None,
+                 max_concurrent_hashes: int = None,
+                 code_key: bytes = b"",
+                 hasher: Hasher = None,
+                 hash_target: float = None,
+                 create_schema: bool = True,
+                 cache: UserCache = None,
+                 taken_filter: BloomFilter = None,
+                 outbox: Outbox = None,
+                 email_validator: EmailValidator = None,
+                 login_throttle: LoginThrottle = None,
+                 sessions: Sessions = None
                  ) -> None:
         """Configure how the account handler works.
 
         Parameters
         ----------
-        engine : Union[MongoEngine, SQLEngine]
+        engine : Union[MongoEngine, SQLEngine, MemoryEngine]
             Engine for storing accounts.
         password_policy : PasswordPolicy, optional
             Password policies, by default PasswordPolicy()
@@ -87,13 +162,48 @@ class AccountHandler:
         password_reset_expires : timedelta, optional
             Amount of time until a password reset expires,
             by default timedelta(hours=24)
+        hash_executor : Executor, optional
+            Thread or process pool password hashing is ran within,
+            by default None what uses the event loop's default executor.
+        max_concurrent_hashes : int, optional
+            Max amount of hashes ran at once, by default None
+        code_key : bytes, optional
+            Key used to digest email confirmation & password reset
+            codes before storing them, by default b""
+        hasher : Hasher, optional
+            Used to hash passwords, by default BcryptHasher()
+        hash_target : float, optional
+            If given the hasher's cost is tuned on start to the
+            highest cost what hashes within this many seconds,
+            by default None
+        create_schema : bool, optional
+            Creates tables, indexes & applies migrations on start,
+            can be disabled if the schema is known to be up to date,
+            by default True
+        cache : UserCache, optional
+            Caches user lookups, by default None
+        taken_filter : BloomFilter, optional
+            Filter of taken names & emails, seeded on start.
+            Names & emails not within the filter skip the database
+            when checking if they're taken, by default None
+        outbox : Outbox, optional
+            Stores emails within the database before sending them,
+            otherwise emails are only queued in memory,
+            by default None
+        email_validator : EmailValidator, optional
+            Validates emails, by default EmailValidator()
+        login_throttle : LoginThrottle, optional
+            Limits login attempts, by default None
+        sessions : Sessions, optional
+            Enables session tokens, by default None
         """
 
         if isinstance(engine, SQLEngine):
             self._db = engine._connection
             self._db_wrapper = SqlWrapper(self._db)
-
-            create_tables(str(engine._connection.url))
+        elif isinstance(engine, MemoryEngine):
+            self._db = MemoryWrapper(engine._snapshot)
+            self._db_wrapper = self._db
         else:
             self._db = AsyncIOMotorClient(
                 engine._connection
@@ -102,7 +212,22 @@ class AccountHandler:
 
         self._smtp = smtp
         self._policy = password_policy._policy
+        self._breached = password_policy._breached
         self._password_reset_expires = password_reset_expires
+        self._hash_executor = hash_executor
+        self._max_concurrent_hashes = max_concurrent_hashes
+        self._code_key = code_key
+        self._hasher = hasher if hasher else BcryptHasher()
+        self._hash_target = hash_target
+        self._create_schema = create_schema
+        self._cache = cache
+        self._taken = taken_filter
+        self._outbox = outbox
+        self._email_validator = (
+            email_validator if email_validator else EmailValidator()
+        )
+        self._throttle = login_throttle
+        self._sessions = sessions
 
     async def start(self) -> None:
         """Opens needed sessions.
@@ -110,17 +235,135 @@ class AccountHandler:
 
         if isinstance(self._db, Database):
             await self._db.connect()
+        elif isinstance(self._db, MemoryWrapper):
+            self._db.load()
+
+        if self._create_schema:
+            await self._db_wrapper.create_schema()
+
+        if self._smtp:
+            await self._smtp.start()
+
+            if self._outbox is not None:
+                await self._outbox.start(self._db_wrapper, self._smtp)
 
-        self._jobs = await aiojobs.create_scheduler()
+        self._hash_limit = asyncio.Semaphore(
+            self._max_concurrent_hashes
+        ) if self._max_concurrent_hashes else None
 
-    async def close(self) -> None:
+        if self._hash_target:
+            self._hasher.cost = await self._run_hasher(
+                self._hasher.benchmark, self._hash_target
+            )
+
+        if self._taken is not None:
+            async for result in self._db_wrapper.iterate(
+                    "user", columns=("name", "email")):
+                row = dict(result)
+                self._mark_taken(row.get("name"), row.get("email"))
+
+    async def close(self, timeout: float = 10.0) -> None:
         """Closes any closed sessions.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for queued emails to be sent,
+            emails still queued afterwards are dropped,
+            by default 10.0
         """
 
+        if self._outbox is not None:
+            await self._outbox.close(timeout)
+
+        if self._smtp:
+            await self._smtp.close(timeout)
+
         if isinstance(self._db, Database):
             await self._db.disconnect()
+        elif isinstance(self._db, MemoryWrapper):
+            self._db.save()
+
+    def _confirmed_filter(self, email_confirmed: Optional[bool]
+                          ) -> Optional[Dict[str, list]]:
+        """Filter given as 'in_', unconfirmed users are any user
+           whose email isn't confirmed, including users without
+           a email & users still confirming.
+        """
+
+        if email_confirmed is None:
+            return None
+
+        return {
+            "email_confirmed": [True] if email_confirmed else [None, False]
+        }
+
+    async def users_page(self, limit: int = 100, cursor: str = None,
+                         email_confirmed: bool = None,
+                         descending: bool = False
+                         ) -> Tuple[List[Tuple[UserModel, User]],
+                                    Optional[str]]:
+        """Used to list users a page at a time, pages are
+           ordered by user ID.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Max amount of users per page, by default 100
+        cursor : str, optional
+            Cursor returned with the previous page, by default None
+        email_confirmed : bool, optional
+            by default None
+        descending : bool, optional
+            by default False
+
+        Returns
+        -------
+        List[Tuple[UserModel, User]]
+        Optional[str]
+            Cursor for the next page, None if this is the last page.
+
+        Raises
+        ------
+        AccountDetailsError
+            Raised when the cursor is invalid or limit is below 1.
+        """
+
+        if limit < 1:
+            raise AccountDetailsError("Limit must be at least 1.")
+
+        direction = "d" if descending else "a"
+
+        after = None
+        if cursor:
+            try:
+                given_direction, after = urlsafe_b64decode(
+                    cursor.encode()
+                ).decode().split(":", 1)
+            except ValueError:
+                raise AccountDetailsError("Cursor is invalid.")
+
+            if given_direction != direction:
+                raise AccountDetailsError("Cursor is invalid.")
+
+        # One extra user is fetched to know if there's a next page.
+        results = await self._db_wrapper.page(
+            "user", limit + 1, after, descending=descending,
+            columns=_MODEL_COLUMNS,
+            in_=self._confirmed_filter(email_confirmed)
+        )
+
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = urlsafe_b64encode(
+                f"{direction}:{results[-1]['user_id']}".encode()
+            ).decode()
 
-        await self._jobs.close()
+        return [
+            (UserModel.from_row(result), self.user(result["user_id"]))
+            for result in results
+        ], next_cursor
 
     async def users(self, email_confirmed: bool = None
                     ) -> AsyncGenerator[Tuple[UserModel, User], None]:
@@ -137,19 +380,237 @@ class AccountHandler:
         User
         """
 
-        if email_confirmed is not None:
-            and_ = {
-                "email_confirmed": None if email_confirmed is False else True
-            }
-        else:
-            and_ = None
-
-        async for result in self._db_wrapper.iterate("user", and_):
+        async for result in self._db_wrapper.iterate(
+                "user", columns=_MODEL_COLUMNS,
+                in_=self._confirmed_filter(email_confirmed)):
             yield (
-                UserModel(**result),
+                UserModel.from_row(result),
                 self.user(result["user_id"])
             )
 
+    async def user_ids(self, batch_size: int = 1000,
+                       email_confirmed: bool = None
+                       ) -> AsyncGenerator[List[str], None]:
+        """Used to list user IDs in batches, without building
+           models or user objects.
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            Amount of user IDs fetched & yielded at once,
+            by default 1000
+        email_confirmed : bool, optional
+            by default None
+
+        Yields
+        -------
+        List[str]
+        """
+
+        async for batch in self._db_wrapper.batches(
+                "user", batch_size, columns=("user_id",),
+                in_=self._confirmed_filter(email_confirmed)):
+            yield [row["user_id"] for row in batch]
+
+    async def user_rows(self, columns: Iterable[str] = _MODEL_COLUMNS,
+                        batch_size: int = 1000,
+                        email_confirmed: bool = None,
+                        as_dict: bool = False
+                        ) -> AsyncGenerator[List[Union[tuple, dict]],
+                                            None]:
+        """Used to list raw user rows in batches, without building
+           models or user objects.
+
+        Parameters
+        ----------
+        columns : Iterable[str], optional
+            Any of user_id, name, email & email_confirmed,
+            by default all of them
+        batch_size : int, optional
+            Amount of rows fetched & yielded at once, by default 1000
+        email_confirmed : bool, optional
+            by default None
+        as_dict : bool, optional
+            Yield dicts instead of tuples ordered like columns,
+            by default False
+
+        Yields
+        -------
+        List[Union[tuple, dict]]
+
+        Raises
+        ------
+        AccountDetailsError
+            Raised when a column isn't allowed.
+        """
+
+        columns = tuple(columns)
+        for column in columns:
+            if column not in _MODEL_COLUMNS:
+                raise AccountDetailsError(
+                    f"Column {column} can't be listed."
+                )
+
+        async for batch in self._db_wrapper.batches(
+                "user", batch_size, columns=columns,
+                in_=self._confirmed_filter(email_confirmed)):
+            if as_dict:
+                yield [
+                    {column: row[column] for column in columns}
+                    for row in batch
+                ]
+            else:
+                yield [
+                    tuple(row[column] for column in columns)
+                    for row in batch
+                ]
+
+    async def count_users(self, email_confirmed: bool = None) -> int:
+        """Counts users within the database.
+
+        Parameters
+        ----------
+        email_confirmed : bool, optional
+            by default None
+
+        Returns
+        -------
+        int
+        """
+
+        return await self._db_wrapper.count(
+            "user", in_=self._confirmed_filter(email_confirmed)
+        )
+
+    async def stats(self) -> UserStats:
+        """Gets account statistics.
+
+        Returns
+        -------
+        UserStats
+        """
+
+        counts = await self._db_wrapper.user_stats(
+            datetime.now() - self._password_reset_expires
+        )
+
+        return UserStats(
+            total=counts["total"],
+            confirmed=counts["confirmed"],
+            unconfirmed=counts["total"] - counts["confirmed"],
+            pending_resets=counts["pending_resets"]
+        )
+
+    async def _get_user(self, search: dict,
+                        columns: Iterable[str] = _MODEL_COLUMNS
+                        ) -> Optional[Mapping]:
+        """Gets a user from the cache if enabled, otherwise
+           from the database.
+
+        Parameters
+        ----------
+        search : dict
+        columns : Iterable[str], optional
+            Columns needed, only lookups within _MODEL_COLUMNS
+            are cached, by default _MODEL_COLUMNS
+
+        Returns
+        -------
+        Optional[Mapping]
+        """
+
+        # Password hashes & session counters are never cached.
+        if self._cache is None or not set(columns) <= set(_MODEL_COLUMNS):
+            return await self._db_wrapper.get("user", search, columns)
+
+        result = self._cache.get(search)
+        if result:
+            return result
+
+        result = await self._db_wrapper.get("user", search, _MODEL_COLUMNS)
+        if result:
+            self._cache.set(result)
+
+        return result
+
+    async def _write_with_email(self, write: Awaitable[None],
+                                email: Optional[str], code: Optional[str],
+                                type_: str) -> None:
+        """Runs a write, then sends a email if a code is given.
+           With a outbox the email is stored within the same
+           transaction as the write.
+        """
+
+        if not (code and email and self._smtp):
+            await write
+        elif self._outbox is not None:
+            async with self._db_wrapper.transaction():
+                await write
+                await self._db_wrapper.insert(
+                    "outbox", self._outbox._message(email, code, type_)
+                )
+        else:
+            await write
+            await self._smtp._enqueue(email, code, type_)
+
+    def _invalidate(self, user_id: str) -> None:
+        if self._cache is not None:
+            self._cache.invalidate(user_id)
+
+        if self._sessions is not None:
+            self._sessions._forget(user_id)
+
+    def _mark_taken(self, name: str = None, email: str = None) -> None:
+        if self._taken is not None:
+            if name:
+                self._taken.add(detail_key("name", name))
+            if email:
+                self._taken.add(detail_key("email", email))
+
+    def _maybe_taken(self, key: str, value: str) -> bool:
+        return (self._taken is None or
+                detail_key(key, value) in self._taken)
+
+    async def available(self, name: str = None, email: str = None) -> bool:
+        """Used to check if a name or email isn't taken.
+
+        Parameters
+        ----------
+        name : str, optional
+            by default None
+        email : str, optional
+            by default None
+
+        Returns
+        -------
+        bool
+            True if none of the given details are taken.
+
+        Raises
+        ------
+        AccountDetailsError
+
+        Notes
+        -----
+        The taken filter only knows about accounts created or
+        updated by this handler since start, taken details are
+        still rejected when they're used.
+        """
+
+        values = {}
+        if name and self._maybe_taken("name", name):
+            values["name"] = name
+        if email and self._maybe_taken("email", email):
+            values["email"] = email
+
+        if not name and not email:
+            raise AccountDetailsError("User or email must be provided.")
+
+        if not values:
+            return True
+
+        return not await self._db_wrapper.exists("user", values)
+
     def user(self, user_id: str) -> User:
         """Used to interact with user.
 
@@ -164,6 +625,53 @@ class AccountHandler:
 
         return User(self, user_id)
 
+    async def _run_hasher(self, func: Callable, *args: Any) -> Any:
+        """Runs a hashing function within the hash executor.
+
+        Parameters
+        ----------
+        func : Callable
+            Must be picklable if a process pool is used.
+
+        Returns
+        -------
+        Any
+        """
+
+        loop = asyncio.get_event_loop()
+
+        if self._hash_limit:
+            async with self._hash_limit:
+                return await loop.run_in_executor(
+                    self._hash_executor, func, *args
+                )
+
+        return await loop.run_in_executor(
+            self._hash_executor, func, *args
+        )
+
+    async def _hash_password(self, password: str) -> bytes:
+        return await self._run_hasher(self._hasher.hash, password.encode())
+
+    async def _check_password(self, password: str, hashed: bytes) -> bool:
+        if self._hasher.identify(hashed):
+            hasher = self._hasher
+        else:
+            hasher = identify_hasher(hashed)  # type: ignore
+            if not hasher:
+                return False
+
+        return await self._run_hasher(
+            hasher.verify, password.encode(), hashed
+        )
+
+    def _needs_rehash(self, hashed: bytes) -> bool:
+        return (not self._hasher.identify(hashed) or
+                self._hasher.needs_rehash(hashed))
+
+    def _code_digest(self, code: str) -> str:
+        return code_digest(code, self._code_key)
+
     def _validate_details(self, name: str = None,
                           password: str = None) -> None:
         """Used to validate details.
@@ -178,6 +686,7 @@ class AccountHandler:
         NameLengthInvalidError
         NameInvalidCharactersError
         PasswordPolicyError
+        PasswordBreachedError
         """
 
         if name:
@@ -197,8 +706,58 @@ class AccountHandler:
             if results:
                 raise PasswordPolicyError(results)
 
+            if self._breached is not None and password in self._breached:
+                raise PasswordBreachedError()
+
+    async def __login(self, password: str, name: Optional[str],
+                      email: Optional[str], require_email_confirmed: bool,
+                      throttle_key: Optional[str]) -> Mapping:
+        """Checks a login, returning the user's login columns.
+        """
+
+        if name:
+            search = {
+                "name": name
+            }
+        elif email:
+            search = {
+                "email": email
+            }
+        else:
+            raise AccountDetailsError("User or email must be provided.")
+
+        if self._throttle is not None:
+            # Throttled before the user is looked up, so attempts on
+            # names & emails which don't exist are throttled too.
+            account = detail_key(*next(iter(search.items())))
+            self._throttle._attempt(account, throttle_key)
+
+        result = await self._get_user(search, _LOGIN_COLUMNS)
+        if not result:
+            raise InvalidLogin()
+
+        if (require_email_confirmed and self._smtp and result["email"]
+                and not result["email_confirmed"]):
+            raise InvalidLogin()
+
+        if not await self._check_password(password, result["password"]):
+            raise InvalidLogin()
+
+        if self._needs_rehash(result["password"]):
+            await self._db_wrapper.update(
+                "user", {"user_id": result["user_id"]},
+                {"password": await self._hash_password(password)}
+            )
+            self._invalidate(result["user_id"])
+
+        if self._throttle is not None:
+            self._throttle._succeeded(account)
+
+        return result
+
     async def login(self, password: str, name: str = None,
-                    email: str = None, require_email_confirmed: bool = True
+                    email: str = None, require_email_confirmed: bool = True,
+                    throttle_key: str = None
                     ) -> Tuple[UserModel, User]:
         """Used to validate user's login.
 
@@ -211,6 +770,10 @@ class AccountHandler:
             by default None
         require_email_confirmed : bool, optional
             If true email must be confirmed, by default True
+        throttle_key : str, optional
+            Attempts with the same key are throttled together when
+            a login throttle is used, e.g. the client's IP address,
+            by default None
 
         Returns
         -------
@@ -223,36 +786,132 @@ class AccountHandler:
         ------
         InvalidLogin
             Raised when user login is invalid.
+        LoginThrottled
+            Raised when too many login attempts have been made.
         AccountDetailsError
         """
 
-        if name:
-            search = {
-                "name": name
-            }
-        elif email:
-            search = {
-                "email": email
-            }
-        else:
-            raise AccountDetailsError("User or email must be provided.")
+        result = await self.__login(
+            password, name, email, require_email_confirmed, throttle_key
+        )
 
-        result = await self._db_wrapper.get("user", search)
-        if not result:
-            raise InvalidLogin()
+        return UserModel.from_row(result), self.user(result["user_id"])
 
-        if (require_email_confirmed and self._smtp and result["email"]
-                and not result["email_confirmed"]):
-            raise InvalidLogin()
+    async def login_session(self, password: str, name: str = None,
+                            email: str = None,
+                            require_email_confirmed: bool = True,
+                            throttle_key: str = None
+                            ) -> Tuple[UserModel, User, str]:
+        """Used to validate user's login & issue a session token,
+           what 'verify_session' checks without the password.
 
-        if not checkpw(password.encode(), result["password"]):
-            raise InvalidLogin()
+        Parameters
+        ----------
+        password : str
+        name : str, optional
+            by default None
+        email : str, optional
+            by default None
+        require_email_confirmed : bool, optional
+            If true email must be confirmed, by default True
+        throttle_key : str, optional
+            Attempts with the same key are throttled together when
+            a login throttle is used, e.g. the client's IP address,
+            by default None
 
-        return UserModel(**result), self.user(result["user_id"])
+        Returns
+        -------
+        UserModel
+            Holds info on user.
+        User
+            Used to interact with user.
+        str
+            Session token.
 
-    def _email_regenerate(self) -> dict:
-        return {
-            "email_vaildate": token_urlsafe(32),
+        Raises
+        ------
+        InvalidLogin
+            Raised when user login is invalid.
+        LoginThrottled
+            Raised when too many login attempts have been made.
+        AccountDetailsError
+            Raised when sessions aren't enabled.
+        """
+
+        if self._sessions is None:
+            raise AccountDetailsError("Sessions aren't enabled.")
+
+        result = await self.__login(
+            password, name, email, require_email_confirmed, throttle_key
+        )
+
+        return (
+            UserModel.from_row(result), self.user(result["user_id"]),
+            self._sessions._issue(result["user_id"], _row_counter(result))
+        )
+
+    async def verify_session(self, token: str) -> User:
+        """Used to verify a session token, the database is only
+           used when the user's session counter isn't cached.
+
+        Parameters
+        ----------
+        token : str
+
+        Returns
+        -------
+        User
+
+        Raises
+        ------
+        SessionInvalid
+            Raised when the token is invalid, expired or revoked.
+        AccountDetailsError
+            Raised when sessions aren't enabled.
+
+        Notes
+        -----
+        Counters are cached apart from the user cache. Revoking
+        forgets the counter within this process, tokens revoked by
+        other processes are accepted for up to the Sessions'
+        counter_ttl, a counter_ttl of 0 always reads the database.
+        """
+
+        if self._sessions is None:
+            raise AccountDetailsError("Sessions aren't enabled.")
+
+        user_id, counter = self._sessions._verify(token)
+
+        current = self._sessions._counter(user_id)
+        if current is None:
+            result = await self._db_wrapper.get(
+                "user", {"user_id": user_id}, ("user_id", "session_counter")
+            )
+            if not result:
+                raise SessionInvalid()
+
+            current = _row_counter(result)
+            self._sessions._cache(user_id, current)
+
+        if counter != current:
+            raise SessionInvalid()
+
+        return self.user(user_id)
+
+    def _email_regenerate(self) -> Tuple[str, dict]:
+        """Generates a new email confirmation code.
+
+        Returns
+        -------
+        str
+            Code to send to the user.
+        dict
+            Values to store, only the code's digest is stored.
+        """
+
+        code = token_urlsafe(32)
+        return code, {
+            "email_vaildate": self._code_digest(code),
             "email_confirmed": False
         }
 
@@ -275,20 +934,13 @@ class AccountHandler:
         UnableToConfirmEmail
         """
 
-        result = await self._db_wrapper.get("user", {"email": email})
+        result = await self._db_wrapper.get("user", {
+            "email": email,
+            "email_vaildate": self._code_digest(given_code)
+        }, ("user_id",))
         if not result:
             raise UnableToConfirmEmail()
 
-        # Midigates timing attacks.
-        valid = checkpw(
-            given_code.encode(), hashpw(
-                result["email_vaildate"].encode(),
-                gensalt()
-            )
-        )
-        if not valid:
-            raise UnableToConfirmEmail()
-
         await self._db_wrapper.update(
             "user",
             {"user_id": result["user_id"]},
@@ -297,6 +949,7 @@ class AccountHandler:
                 "email_confirmed": True
             }
         )
+        self._invalidate(result["user_id"])
 
         return self.user(result["user_id"])
 
@@ -329,11 +982,84 @@ class AccountHandler:
         else:
             raise AccountDetailsError("User or email must be provided.")
 
-        result = await self._db_wrapper.get("user", values)
+        result = await self._get_user(values)
         if not result:
             raise AccountDetailsError("No user found with those details.")
 
-        return UserModel(**result), self.user(result["user_id"])
+        return UserModel.from_row(result), self.user(result["user_id"])
+
+    async def _account_values(self, password: Union[str, bytes],
+                              email: str = None, name: str = None,
+                              prehashed: bool = False
+                              ) -> Tuple[dict, Optional[str]]:
+        """Validates details of a new account.
+
+        Parameters
+        ----------
+        password : Union[str, bytes]
+            Password, or hash if prehashed.
+        email : str, optional
+        name : str, optional
+        prehashed : bool, optional
+
+        Returns
+        -------
+        dict
+            Values to insert, excluding the password.
+        Optional[str]
+            Email confirmation code to send.
+
+        Raises
+        ------
+        EmailError
+        PasswordPolicyError
+        NameLengthInvalidError
+        NameInvalidCharactersError
+        AccountDetailsError
+        """
+
+        if not name and not email:
+            raise AccountDetailsError("User or email must be provided.")
+
+        if not all(isinstance(value, str) for value in (name, email)
+                   if value is not None):
+            raise AccountDetailsError("User & email must be strings.")
+
+        if prehashed:
+            self._validate_details(name=name)
+
+            if not isinstance(password, bytes) or not (
+                    self._hasher.identify(password) or
+                    identify_hasher(password)):
+                raise AccountDetailsError("Password hash format unknown.")
+        else:
+            if not password or not isinstance(password, str):
+                raise AccountDetailsError("Password must be provided.")
+
+            self._validate_details(
+                name=name,
+                password=password
+            )
+
+        values = {
+            "user_id": generate_id()
+        }
+
+        if name:
+            values["name"] = name
+
+        code = None
+        if email:
+            values["email"] = await self._email_validator.validate(email)
+
+            if self._smtp:
+                code, regenerated = self._email_regenerate()
+                values = {
+                    **values,
+                    **regenerated
+                }
+
+        return values, code
 
     async def create_account(self, password: str,
                              email: str = None, name: str = None
@@ -369,57 +1095,339 @@ class AccountHandler:
         AccountDetailsError
         """
 
-        if not name and not email:
-            raise AccountDetailsError("User or email must be provided.")
+        values, code = await self._account_values(password, email, name)
+        user_modal = UserModel.from_row(values)
 
-        self._validate_details(
-            name=name,
-            password=password
+        values["password"] = await self._hash_password(  # type: ignore
+            password
         )
 
-        values = {
-            "user_id": generate_id()
-        }
+        # Unique indexes reject taken names & emails.
+        await self._write_with_email(
+            self._db_wrapper.insert("user", values),
+            values.get("email"),
+            code,
+            "confirm"
+        )
+        self._mark_taken(name, values.get("email"))
 
-        if name:
-            values["name"] = name
+        return user_modal, self.user(values["user_id"])
 
-        user_modal = UserModel(**values)
-        if email:
-            try:
-                valid = validate_email(email)
-            except EmailNotValidError as error:
-                raise EmailError(str(error))
+    async def create_accounts(self, accounts: Iterable[Mapping],
+                              batch_size: int = 100,
+                              prehashed: bool = False
+                              ) -> AsyncGenerator[AccountResult, None]:
+        """Used to create many accounts, e.g. when importing users.
 
-            values["email"] = valid.email
+        Parameters
+        ----------
+        accounts : Iterable[Mapping]
+            Each containing a 'password' & a 'name' and/or 'email',
+            'email_confirmed' can be true to skip email confirmation.
+        batch_size : int, optional
+            Amount of accounts validated, hashed & inserted at once,
+            by default 100
+        prehashed : bool, optional
+            If true 'password' is a hash made by a supported hasher,
+            hashes made with outdated parameters are rehashed on login,
+            by default False
 
-            if await self._db_wrapper.exists("user", values):
-                raise DetailsExistError()
+        Yields
+        -------
+        AccountResult
+            In the order the accounts were given, invalid accounts
+            are reported by the result's error.
+        """
 
-            user_modal.email = values["email"]
+        batch = []  # type: List[Mapping]
+        index = 0
+        for account in accounts:
+            batch.append(account)
+
+            if len(batch) == batch_size:
+                for result in await self.__create_batch(
+                        index, batch, prehashed):
+                    yield result
+
+                index += len(batch)
+                batch = []
+
+        if batch:
+            for result in await self.__create_batch(index, batch, prehashed):
+                yield result
+
+    async def __create_batch(self, index: int, accounts: List[Mapping],
+                             prehashed: bool) -> List[AccountResult]:
+        results = []
+        # Result, values, email confirmation code, password.
+        pending = []  # type: List[Tuple[AccountResult, dict, Any, Any]]
+        batch_details = set()
+
+        passwords = [
+            account.get("password") for account in accounts
+        ]  # type: List[Any]
+        if prehashed:
+            passwords = [
+                password.encode() if isinstance(password, str) else password
+                for password in passwords
+            ]
+
+        # Validated concurrently so email domains are looked up at once.
+        validated = await asyncio.gather(*[
+            self._account_values(
+                password,
+                account.get("email"),
+                account.get("name"),
+                prehashed
+            ) for account, password in zip(accounts, passwords)
+        ], return_exceptions=True)
+
+        for offset, (account, password, outcome) in enumerate(
+                zip(accounts, passwords, validated)):
+            result = AccountResult(index=index + offset)
+            results.append(result)
+
+            if isinstance(outcome, AioAccountError):
+                result.error = outcome
+                continue
+            elif isinstance(outcome, BaseException):
+                raise outcome
+
+            values, code = outcome
+
+            # Duplicates within the batch.
+            details = detail_keys(values)
+            if details & batch_details:
+                result.error = DetailsExistError()
+                continue
+
+            batch_details |= details
+
+            if values.get("email") and account.get("email_confirmed"):
+                code = None
+                values.pop("email_vaildate", None)
+                values["email_confirmed"] = True
+
+            pending.append((result, values, code, password))
+
+        # Details already taken, within a single query.
+        in_ = {}
+        for key in ("name", "email"):
+            taken = [
+                values[key] for _, values, _, _ in pending if key in values
+            ]
+            if taken:
+                in_[key] = taken
+
+        if in_:
+            taken_details = set()
+            for row in await self._db_wrapper.get_many(
+                    "user", in_, ("name", "email")):
+                taken_details |= detail_keys(dict(row))
+
+            available = []
+            for pending_account in pending:
+                values = pending_account[1]
+                if detail_keys(values) & taken_details:
+                    pending_account[0].error = DetailsExistError()
+                else:
+                    available.append(pending_account)
+
+            pending = available
+
+        if not pending:
+            return results
+
+        if prehashed:
+            for _, values, _, password in pending:
+                values["password"] = password
+        else:
+            # Spread across the hash executor.
+            hashes = await asyncio.gather(*[
+                self._hash_password(password)
+                for _, _, _, password in pending
+            ])
+            for (_, values, _, _), hashed in zip(pending, hashes):
+                values["password"] = hashed
+
+        # Users & their outbox emails are written together.
+        confirmations = []  # type: List[Tuple[str, str]]
+        async with self._db_wrapper.transaction():
+            rejected = set(await self._db_wrapper.insert_many(
+                "user", [values for _, values, _, _ in pending]
+            ))
+
+            for position, (result, values, code, _) in enumerate(pending):
+                if position in rejected:
+                    result.error = DetailsExistError()
+                    continue
+
+                result.user_id = values["user_id"]
+                self._mark_taken(values.get("name"), values.get("email"))
+
+                if code and self._smtp:
+                    confirmations.append((values["email"], code))
+
+            if confirmations and self._outbox is not None:
+                await self._db_wrapper.insert_many("outbox", [
+                    self._outbox._message(email, code, "confirm")
+                    for email, code in confirmations
+                ])
+
+        if confirmations and self._outbox is None:
+            for email, code in confirmations:
+                await self._smtp._enqueue(email, code, "confirm")
+
+        return results
+
+    def __chunk_ids(self, user_ids: Optional[Iterable[str]],
+                    filter_: Optional[dict], chunk_size: int
+                    ) -> Iterable[Optional[List[str]]]:
+        """Splits user IDs into chunks, yields None if only
+           a filter is given.
 
-            if self._smtp:
-                user_modal.email_confirmed = False
-                values = {
-                    **values,
-                    **self._email_regenerate()
-                }
+        Raises
+        ------
+        AccountDetailsError
+        """
+
+        if filter_ and not set(filter_) <= set(_BULK_FILTER_COLUMNS):
+            raise AccountDetailsError(
+                "Users can only be filtered by "
+                f"{' & '.join(_BULK_FILTER_COLUMNS)} in bulk."
+            )
 
-                await self._jobs.spawn(
-                    self._smtp._send(
-                        values["email"],
-                        values["email_vaildate"],
-                        "confirm"
-                    )
+        if user_ids is None:
+            if not filter_:
+                raise AccountDetailsError(
+                    "User IDs or filter must be provided."
                 )
+
+            yield None
+            return
+
+        chunk = []  # type: List[str]
+        for user_id in user_ids:
+            chunk.append(user_id)
+
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    def __bulk_where(self, filter_: Optional[dict],
+                     chunk: Optional[List[str]]
+                     ) -> Tuple[Optional[dict], Optional[Dict[str, list]]]:
+        """Filter & user IDs given as 'and_' & 'in_', email_confirmed
+           matches the same users as 'users' does.
+        """
+
+        and_ = dict(filter_) if filter_ else {}
+        in_ = {}  # type: Dict[str, list]
+
+        if and_.get("email_confirmed") is not None:
+            in_.update(self._confirmed_filter(and_.pop("email_confirmed")))
+
+        if chunk:
+            in_["user_id"] = chunk
+
+        return and_ or None, in_ or None
+
+    def __invalidate_many(self, user_ids: Optional[List[str]]) -> None:
+        if user_ids is None:
+            if self._cache is not None:
+                self._cache.clear()
+            if self._sessions is not None:
+                self._sessions._forget()
         else:
-            if await self._db_wrapper.exists("user", values):
-                raise DetailsExistError()
+            for user_id in user_ids:
+                self._invalidate(user_id)
 
-        values["password"] = hashpw(  # type: ignore
-            password.encode(), gensalt()
-        )
+    async def delete_users(self, user_ids: Iterable[str] = None,
+                           filter_: dict = None,
+                           chunk_size: int = 500) -> int:
+        """Used to delete many users, this can't be undone.
+
+        Parameters
+        ----------
+        user_ids : Iterable[str], optional
+            by default None
+        filter_ : dict, optional
+            Only users matching all of the given columns
+            are deleted, email_confirmed & password_reset_generated
+            can be filtered by. email_confirmed as False matches
+            any user whose email isn't confirmed, by default None
+        chunk_size : int, optional
+            Amount of user IDs deleted per query, by default 500
 
-        await self._db_wrapper.insert("user", values)
+        Returns
+        -------
+        int
+            Amount of users deleted.
 
-        return user_modal, self.user(values["user_id"])
+        Raises
+        ------
+        AccountDetailsError
+            Raised when no user IDs or filter given, or the filter
+            has a column what can't be filtered by.
+        """
+
+        deleted = 0
+        for chunk in self.__chunk_ids(user_ids, filter_, chunk_size):
+            deleted += await self._db_wrapper.delete_many(
+                "user", *self.__bulk_where(filter_, chunk)
+            )
+            self.__invalidate_many(chunk)
+
+        return deleted
+
+    async def update_users(self, values: dict,
+                           user_ids: Iterable[str] = None,
+                           filter_: dict = None,
+                           chunk_size: int = 500) -> int:
+        """Used to update many users.
+
+        Parameters
+        ----------
+        values : dict
+            Columns to update, only email_confirmed &
+            password_reset_generated can be updated in bulk.
+        user_ids : Iterable[str], optional
+            by default None
+        filter_ : dict, optional
+            Only users matching all of the given columns
+            are updated, email_confirmed & password_reset_generated
+            can be filtered by. email_confirmed as False matches
+            any user whose email isn't confirmed, by default None
+        chunk_size : int, optional
+            Amount of user IDs updated per query, by default 500
+
+        Returns
+        -------
+        int
+            Amount of users matched, MySQL only counts users
+            what were changed.
+
+        Raises
+        ------
+        AccountDetailsError
+            Raised when no user IDs or filter given, or a column
+            what can't be updated or filtered by in bulk is given.
+        """
+
+        if not values or not set(values) <= set(_BULK_UPDATE_COLUMNS):
+            raise AccountDetailsError(
+                f"Only {' & '.join(_BULK_UPDATE_COLUMNS)} "
+                "can be updated in bulk."
+            )
+
+        updated = 0
+        for chunk in self.__chunk_ids(user_ids, filter_, chunk_size):
+            updated += await self._db_wrapper.update_many(
+                "user", values, *self.__bulk_where(filter_, chunk)
+            )
+            self.__invalidate_many(chunk)
+
+        return updated
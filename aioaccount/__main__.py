@@ -0,0 +1,25 @@
+import argparse
+
+from ._breach import build_breach_file
+
+
+cli = argparse.ArgumentParser(prog="python -m aioaccount")
+commands = cli.add_subparsers(dest="command")
+
+breach = commands.add_parser(
+    "breach", help="Builds a breach file for BreachedPasswords."
+)
+breach.add_argument("source", type=str,
+                    help="File of hex SHA-1 hashes, one per line.")
+breach.add_argument("output", type=str)
+breach.add_argument("--record_size", type=int, default=10)
+breach.add_argument("--run_size", type=int, default=10000000)
+
+args = cli.parse_args()
+
+if args.command == "breach":
+    print(build_breach_file(
+        args.source, args.output, args.record_size, args.run_size
+    ))
+else:
+    cli.print_help()
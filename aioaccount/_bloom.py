@@ -0,0 +1,55 @@
+import math
+
+from hashlib import blake2b
+from typing import Iterator
+
+
+class BloomFilter:
+    def __init__(self, capacity: int = 1000000,
+                 error_rate: float = 0.01) -> None:
+        """Probabilistic set of taken names & emails.
+
+        Parameters
+        ----------
+        capacity : int, optional
+            Expected amount of names & emails, by default 1000000
+        error_rate : float, optional
+            False positive rate once capacity is reached,
+            by default 0.01
+
+        Notes
+        -----
+        Items can't be removed, names & emails freed by deleted
+        users only cost a database lookup.
+        """
+
+        self._size = max(8, math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        ))
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    @property
+    def memory(self) -> int:
+        """Bytes used by the filter.
+        """
+
+        return len(self._bits)
+
+    def __positions(self, item: str) -> Iterator[int]:
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+
+        for index in range(self._hashes):
+            yield (first + index * second) % self._size
+
+    def add(self, item: str) -> None:
+        for position in self.__positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self.__positions(item)
+        )
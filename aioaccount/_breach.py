@@ -0,0 +1,191 @@
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+
+from hashlib import sha1
+from typing import IO, Iterable, Iterator, List
+
+_MAGIC = b"AIOBRCH1"
+# Magic, record size & record count.
+_HEADER = struct.Struct("<8sQQ")
+# Records are bucketed by their first 2 bytes.
+_BUCKETS = 1 << 16
+_INDEX = struct.Struct(f"<{_BUCKETS + 1}Q")
+
+
+class BreachedPasswords:
+    def __init__(self, path: str) -> None:
+        """Checks passwords against a breach file made by
+           'build_breach_file', the file is memory mapped so
+           lookups don't read the whole file.
+
+        Parameters
+        ----------
+        path : str
+
+        Raises
+        ------
+        ValueError
+            Raised when the file isn't a breach file.
+        """
+
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, self._record_size, self._count = _HEADER.unpack_from(
+                self._map
+            )
+        except struct.error:
+            magic = None
+
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} isn't a breach file.")
+
+        self._index = _INDEX.unpack_from(self._map, _HEADER.size)
+        self._records = _HEADER.size + _INDEX.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, password: str) -> bool:
+        record = sha1(password.encode()).digest()[:self._record_size]
+        bucket = int.from_bytes(record[:2], "big")
+
+        low, high = self._index[bucket], self._index[bucket + 1]
+        while low < high:
+            middle = (low + high) // 2
+            offset = self._records + middle * self._record_size
+
+            found = self._map[offset:offset + self._record_size]
+            if found == record:
+                return True
+            elif found < record:
+                low = middle + 1
+            else:
+                high = middle
+
+        return False
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def _read_hashes(lines: Iterable[str], record_size: int,
+                 source: str) -> Iterator[bytes]:
+    for number, line in enumerate(lines, 1):
+        # Lines are a SHA-1 hex digest, optionally followed by
+        # ':count' as within the Pwned Passwords downloads.
+        digest = line.split(":", 1)[0].strip()
+        if not digest:
+            continue
+
+        try:
+            record = bytes.fromhex(digest)
+        except ValueError:
+            record = b""
+
+        # A short record would misalign every record after it.
+        if len(digest) != 40 or len(record) != 20:
+            raise ValueError(
+                f"Line {number} of {source} isn't a SHA-1 hex digest."
+            )
+
+        yield record[:record_size]
+
+
+def _write_run(records: List[bytes]) -> IO[bytes]:
+    run = tempfile.TemporaryFile()
+    run.write(b"".join(sorted(records)))
+    run.seek(0)
+
+    return run
+
+
+def _read_run(run: IO[bytes], record_size: int) -> Iterator[bytes]:
+    while True:
+        record = run.read(record_size)
+        if not record:
+            break
+
+        yield record
+
+
+def build_breach_file(source: str, output: str, record_size: int = 10,
+                      run_size: int = 10000000) -> int:
+    """Builds a breach file from a list of SHA-1 password hashes.
+
+    Parameters
+    ----------
+    source : str
+        Path to a file of hex SHA-1 hashes, one per line.
+    output : str
+        Path the breach file is written to.
+    record_size : int, optional
+        Bytes of each hash kept, smaller files have more false
+        positives, by default 10
+    run_size : int, optional
+        Hashes sorted in memory at once, by default 10000000
+
+    Returns
+    -------
+    int
+        Amount of unique hashes written.
+
+    Raises
+    ------
+    ValueError
+        Raised when a line isn't a SHA-1 hex digest, the output
+        isn't written.
+    """
+
+    if not 2 <= record_size <= 20:
+        raise ValueError("record_size must be between 2 & 20.")
+
+    # Sorted runs are merged, so the source can be larger then memory.
+    runs = []
+    try:
+        with open(source, "r") as file:
+            records = []
+            for record in _read_hashes(file, record_size, source):
+                records.append(record)
+                if len(records) == run_size:
+                    runs.append(_write_run(records))
+                    records = []
+
+            if records:
+                runs.append(_write_run(records))
+
+        index = [0] * (_BUCKETS + 1)
+        count = 0
+
+        with open(output + ".tmp", "wb") as file:
+            file.seek(_HEADER.size + _INDEX.size)
+
+            previous = None
+            for record in heapq.merge(
+                    *[_read_run(run, record_size) for run in runs]):
+                if record == previous:
+                    continue
+
+                file.write(record)
+                index[int.from_bytes(record[:2], "big") + 1] += 1
+                previous = record
+                count += 1
+
+            for bucket in range(_BUCKETS):
+                index[bucket + 1] += index[bucket]
+
+            file.seek(0)
+            file.write(_HEADER.pack(_MAGIC, record_size, count))
+            file.write(_INDEX.pack(*index))
+
+        os.replace(output + ".tmp", output)
+    finally:
+        for run in runs:
+            run.close()
+
+    return count
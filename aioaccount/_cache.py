@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, Mapping, Optional, Tuple
+
+
+class UserCache:
+    _users: "OrderedDict[str, Tuple[float, dict]]"
+    _keys: Dict[Tuple[str, str], str]
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0) -> None:
+        """In process cache for user lookups.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            Max amount of users cached, least recently used users
+            are evicted first, by default 1024
+        ttl : float, optional
+            Seconds a user is cached for, by default 60.0
+
+        Notes
+        -----
+        Writes made by this process invalidate cached users,
+        writes made by other processes are only seen after the ttl.
+        Only the columns of UserModel are cached, logins always
+        read the password hash from the database.
+        """
+
+        self._max_size = max_size
+        self._ttl = ttl
+
+        self._users = OrderedDict()
+        # (column, value) -> user_id
+        self._keys = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def get(self, search: dict) -> Optional[dict]:
+        """Gets a cached user.
+
+        Parameters
+        ----------
+        search : dict
+            user_id, name or email.
+
+        Returns
+        -------
+        Optional[dict]
+        """
+
+        if len(search) != 1:
+            return None
+
+        key, value = next(iter(search.items()))
+        if key == "user_id":
+            user_id = value
+        else:
+            user_id = self._keys.get((key, value))
+
+        cached = self._users.get(user_id) if user_id else None
+        if not cached:
+            self.misses += 1
+            return None
+
+        expires, row = cached
+        if expires < monotonic():
+            self.invalidate(row["user_id"])
+            self.misses += 1
+            return None
+
+        self._users.move_to_end(row["user_id"])
+        self.hits += 1
+
+        return row
+
+    def set(self, row: Mapping) -> None:
+        """Caches a user.
+
+        Parameters
+        ----------
+        row : Mapping
+        """
+
+        row = dict(row)
+
+        self.invalidate(row["user_id"])
+
+        self._users[row["user_id"]] = (monotonic() + self._ttl, row)
+        for key in ("name", "email"):
+            if row.get(key):
+                self._keys[(key, row[key])] = row["user_id"]
+
+        while len(self._users) > self._max_size:
+            self.invalidate(next(iter(self._users)))
+
+    def invalidate(self, user_id: str) -> None:
+        """Removes a user from the cache.
+
+        Parameters
+        ----------
+        user_id : str
+        """
+
+        cached = self._users.pop(user_id, None)
+        if not cached:
+            return
+
+        _, row = cached
+        for key in ("name", "email"):
+            if self._keys.get((key, row.get(key))) == user_id:
+                del self._keys[(key, row[key])]
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._keys.clear()
@@ -1 +1,9 @@
 _MAX_NAME_LEN = 128
+
+# Columns needed to build a UserModel.
+_MODEL_COLUMNS = ("user_id", "name", "email", "email_confirmed")
+# Columns needed to check a login & issue a session.
+_LOGIN_COLUMNS = _MODEL_COLUMNS + ("password", "session_counter")
+# Columns what can be updated & filtered by in bulk.
+_BULK_UPDATE_COLUMNS = ("email_confirmed", "password_reset_generated")
+_BULK_FILTER_COLUMNS = ("email_confirmed", "password_reset_generated")
@@ -0,0 +1,126 @@
+import asyncio
+
+from collections import OrderedDict
+from functools import partial
+from time import monotonic
+from typing import Dict, Optional, Tuple, Union
+from email_validator import validate_email, EmailNotValidError
+
+from ._errors import EmailError
+
+
+class EmailValidator:
+    _syntax: "OrderedDict[str, Union[str, Tuple[str, str]]]"
+    _domains: "OrderedDict[str, Tuple[float, Optional[str]]]"
+    _lookups: Dict[str, "asyncio.Future[Optional[str]]"]
+
+    def __init__(self, check_deliverability: bool = True,
+                 cache_size: int = 4096,
+                 domain_ttl: float = 3600.0) -> None:
+        """Validates & normalizes emails.
+
+        Parameters
+        ----------
+        check_deliverability : bool, optional
+            Checks the email's domain accepts mail using DNS,
+            ran within the event loop's default executor,
+            by default True
+        cache_size : int, optional
+            Max amount of emails & domains cached, by default 4096
+        domain_ttl : float, optional
+            Seconds a domain's deliverability is cached for,
+            by default 3600.0
+        """
+
+        self._check_deliverability = check_deliverability
+        self._cache_size = cache_size
+        self._domain_ttl = domain_ttl
+
+        # email -> error or (normalized email, domain)
+        self._syntax = OrderedDict()
+        # domain -> (expires, error)
+        self._domains = OrderedDict()
+        self._lookups = {}
+
+    def __cache(self, cache: OrderedDict, key: str, value) -> None:
+        cache[key] = value
+        if len(cache) > self._cache_size:
+            cache.popitem(last=False)
+
+    def __check_syntax(self, email: str) -> Tuple[str, str]:
+        result = self._syntax.get(email)
+        if result is None:
+            try:
+                valid = validate_email(email, check_deliverability=False)
+            except EmailNotValidError as error:
+                result = str(error)
+            else:
+                result = (valid.email, valid.ascii_domain)
+
+            self.__cache(self._syntax, email, result)
+        else:
+            self._syntax.move_to_end(email)
+
+        if isinstance(result, str):
+            raise EmailError(result)
+
+        return result
+
+    async def __lookup(self, email: str) -> Optional[str]:
+        try:
+            await asyncio.get_event_loop().run_in_executor(
+                None, partial(validate_email, email, check_deliverability=True)
+            )
+        except EmailNotValidError as error:
+            return str(error)
+
+        return None
+
+    async def __check_domain(self, email: str, domain: str) -> None:
+        cached = self._domains.get(domain)
+        if cached is not None and cached[0] > monotonic():
+            error = cached[1]
+        else:
+            # Concurrent signups for a domain share a single lookup.
+            lookup = self._lookups.get(domain)
+            if lookup is None:
+                lookup = asyncio.ensure_future(self.__lookup(email))
+                self._lookups[domain] = lookup
+                try:
+                    error = await asyncio.shield(lookup)
+                finally:
+                    del self._lookups[domain]
+
+                self.__cache(
+                    self._domains, domain,
+                    (monotonic() + self._domain_ttl, error)
+                )
+            else:
+                error = await asyncio.shield(lookup)
+
+        if error is not None:
+            raise EmailError(error)
+
+    async def validate(self, email: str) -> str:
+        """Validates a email.
+
+        Parameters
+        ----------
+        email : str
+
+        Returns
+        -------
+        str
+            Normalized email.
+
+        Raises
+        ------
+        EmailError
+        """
+
+        normalized, domain = self.__check_syntax(email)
+
+        if self._check_deliverability:
+            await self.__check_domain(normalized, domain)
+
+        return normalized
@@ -31,3 +31,23 @@ class MongoEngine:
 
         self._connection = f"mongodb://{host}:{port}"
         self._database = database
+
+
+class MemoryEngine:
+    def __init__(self, snapshot: str = None) -> None:
+        """For storing accounts in memory, useful for tests,
+           benchmarks & small deployments.
+
+        Parameters
+        ----------
+        snapshot : str, optional
+            Path accounts are loaded from on start & saved to on
+            close, by default None what keeps nothing.
+
+        Notes
+        -----
+        Snapshots are pickled, only load snapshots this
+        process could have written.
+        """
+
+        self._snapshot = snapshot
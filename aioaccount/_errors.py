@@ -43,11 +43,39 @@ class PasswordPolicyError(AccountDetailsError):
         super().__init__("Password doesn't meet password policy.", *args)
 
 
+class PasswordBreachedError(PasswordPolicyError):
+    def __init__(self, *args: object) -> None:
+        self.fails = []
+        AccountDetailsError.__init__(
+            self, "Password has been found within a data breach.", *args
+        )
+
+
 class InvalidLogin(AioAccountError):
     def __init__(self, *args: object) -> None:
         super().__init__("Provided details are incorrect.", *args)
 
 
+class LoginThrottled(InvalidLogin):
+    def __init__(self, retry_after: float, *args: object) -> None:
+        self.retry_after = retry_after
+        AioAccountError.__init__(
+            self, "Too many login attempts, try again later.", *args
+        )
+
+
+class SessionInvalid(AioAccountError):
+    def __init__(self, *args: object) -> None:
+        super().__init__("Session is invalid or has expired.", *args)
+
+
+class SmtpNotStarted(AioAccountError):
+    def __init__(self, *args: object) -> None:
+        super().__init__(
+            "SMTP client isn't started, call 'AccountHandler.start'.", *args
+        )
+
+
 class UserIdError(AioAccountError):
     def __init__(self, msg: str = "User id incorrect.", *args: object) -> None:
         super().__init__(msg, *args)
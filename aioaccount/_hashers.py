@@ -0,0 +1,257 @@
+import hmac
+import hashlib
+import os
+
+from time import perf_counter
+from base64 import b64encode, b64decode
+from typing import Optional, Tuple
+from bcrypt import hashpw, gensalt, checkpw
+
+try:
+    import argon2
+except ImportError:
+    argon2 = None
+
+
+class Hasher:
+    """Base password hasher, hashers are ran within the hash executor
+       so must be picklable.
+    """
+
+    prefix: Tuple[bytes, ...] = ()
+    min_cost = 1
+    max_cost = 1
+
+    cost: int
+
+    def hash(self, password: bytes) -> bytes:
+        raise NotImplementedError()
+
+    def verify(self, password: bytes, hashed: bytes) -> bool:
+        raise NotImplementedError()
+
+    def needs_rehash(self, hashed: bytes) -> bool:
+        """Checks if the hash was made with outdated parameters.
+
+        Parameters
+        ----------
+        hashed : bytes
+
+        Returns
+        -------
+        bool
+        """
+
+        raise NotImplementedError()
+
+    def identify(self, hashed: bytes) -> bool:
+        return hashed.startswith(self.prefix)
+
+    def benchmark(self, target: float) -> int:
+        """Finds the highest cost what hashes within the target.
+
+        Parameters
+        ----------
+        target : float
+            Seconds a single hash should take.
+
+        Returns
+        -------
+        int
+            Cost, doesn't modify this hasher.
+        """
+
+        current = self.cost
+        cost = self.min_cost
+
+        try:
+            while cost < self.max_cost:
+                self.cost = cost + 1
+
+                started = perf_counter()
+                self.hash(b"aioaccount benchmark")
+                if perf_counter() - started > target:
+                    break
+
+                cost += 1
+        finally:
+            self.cost = current
+
+        return cost
+
+
+class BcryptHasher(Hasher):
+    prefix = (b"$2a$", b"$2b$", b"$2y$")
+    min_cost = 4
+    max_cost = 31
+
+    def __init__(self, rounds: int = 12) -> None:
+        """Hashes passwords using bcrypt.
+
+        Parameters
+        ----------
+        rounds : int, optional
+            Log2 of the work factor, by default 12
+        """
+
+        self.cost = rounds
+
+    def hash(self, password: bytes) -> bytes:
+        return hashpw(password, gensalt(self.cost))
+
+    def verify(self, password: bytes, hashed: bytes) -> bool:
+        return checkpw(password, hashed)
+
+    def needs_rehash(self, hashed: bytes) -> bool:
+        return int(hashed[4:6]) != self.cost
+
+
+class ScryptHasher(Hasher):
+    prefix = (b"$scrypt$",)
+    min_cost = 10
+    max_cost = 22
+
+    def __init__(self, n_log2: int = 15, r: int = 8, p: int = 1,
+                 key_len: int = 64, salt_len: int = 16) -> None:
+        """Hashes passwords using scrypt.
+
+        Parameters
+        ----------
+        n_log2 : int, optional
+            Log2 of the CPU/memory cost, by default 15
+        r : int, optional
+            Block size, by default 8
+        p : int, optional
+            Parallelization, by default 1
+        key_len : int, optional
+            by default 64
+        salt_len : int, optional
+            by default 16
+        """
+
+        self.cost = n_log2
+        self._r = r
+        self._p = p
+        self._key_len = key_len
+        self._salt_len = salt_len
+
+    @staticmethod
+    def _derive(password: bytes, salt: bytes, n_log2: int,
+                r: int, p: int, key_len: int) -> bytes:
+        return hashlib.scrypt(
+            password, salt=salt, n=2 ** n_log2, r=r, p=p,
+            dklen=key_len, maxmem=129 * r * p * 2 ** n_log2
+        )
+
+    @staticmethod
+    def _parse(hashed: bytes) -> Optional[Tuple[int, int, int, bytes, bytes]]:
+        try:
+            _, _, params, salt, key = hashed.split(b"$")
+            n_log2, r, p = (
+                int(param.split(b"=")[1]) for param in params.split(b",")
+            )
+            return n_log2, r, p, b64decode(salt), b64decode(key)
+        except ValueError:
+            return None
+
+    def hash(self, password: bytes) -> bytes:
+        salt = os.urandom(self._salt_len)
+        key = self._derive(
+            password, salt, self.cost, self._r, self._p, self._key_len
+        )
+
+        return b"$scrypt$ln=%d,r=%d,p=%d$%s$%s" % (
+            self.cost, self._r, self._p, b64encode(salt), b64encode(key)
+        )
+
+    def verify(self, password: bytes, hashed: bytes) -> bool:
+        parsed = self._parse(hashed)
+        if not parsed:
+            return False
+
+        n_log2, r, p, salt, key = parsed
+
+        return hmac.compare_digest(
+            self._derive(password, salt, n_log2, r, p, len(key)), key
+        )
+
+    def needs_rehash(self, hashed: bytes) -> bool:
+        parsed = self._parse(hashed)
+        if not parsed:
+            return True
+
+        n_log2, r, p, _, key = parsed
+
+        return (n_log2, r, p, len(key)) != (
+            self.cost, self._r, self._p, self._key_len
+        )
+
+
+class Argon2Hasher(Hasher):
+    prefix = (b"$argon2",)
+    min_cost = 1
+    max_cost = 16
+
+    def __init__(self, time_cost: int = 3, memory_cost: int = 65536,
+                 parallelism: int = 4) -> None:
+        """Hashes passwords using argon2id, requires argon2-cffi.
+
+        Parameters
+        ----------
+        time_cost : int, optional
+            Amount of iterations, by default 3
+        memory_cost : int, optional
+            Memory usage in kibibytes, by default 65536
+        parallelism : int, optional
+            by default 4
+        """
+
+        if argon2 is None:
+            raise ImportError("argon2-cffi is required for Argon2Hasher.")
+
+        self.cost = time_cost
+        self._memory_cost = memory_cost
+        self._parallelism = parallelism
+
+    def __hasher(self) -> "argon2.PasswordHasher":
+        return argon2.PasswordHasher(
+            time_cost=self.cost,
+            memory_cost=self._memory_cost,
+            parallelism=self._parallelism
+        )
+
+    def hash(self, password: bytes) -> bytes:
+        return self.__hasher().hash(password).encode()
+
+    def verify(self, password: bytes, hashed: bytes) -> bool:
+        try:
+            return self.__hasher().verify(hashed, password)
+        except argon2.exceptions.VerificationError:
+            return False
+        except argon2.exceptions.InvalidHash:
+            return False
+
+    def needs_rehash(self, hashed: bytes) -> bool:
+        return self.__hasher().check_needs_rehash(hashed.decode())
+
+
+def identify_hasher(hashed: bytes) -> Optional[Hasher]:
+    """Gets a hasher able to verify the given hash.
+
+    Parameters
+    ----------
+    hashed : bytes
+
+    Returns
+    -------
+    Optional[Hasher]
+    """
+
+    if hashed.startswith(BcryptHasher.prefix):
+        return BcryptHasher()
+    elif hashed.startswith(ScryptHasher.prefix):
+        return ScryptHasher()
+    elif argon2 is not None and hashed.startswith(Argon2Hasher.prefix):
+        return Argon2Hasher()
+
+    return None
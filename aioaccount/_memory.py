@@ -0,0 +1,508 @@
+import os
+import pickle
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import (
+    AsyncGenerator,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple
+)
+from sqlalchemy import Table
+
+from ._errors import DetailsExistError
+from ._sql import user_table, outbox_table
+from ._util import generate_id
+
+_SNAPSHOT_VERSION = 1
+
+
+class _MemoryTable:
+    _ordered: List[str]
+
+    def __init__(self, wrapper: "MemoryWrapper", table: Table,
+                 unique: Iterable[str], defaults: dict = None) -> None:
+        self._wrapper = wrapper
+        self.primary = next(iter(table.primary_key.columns)).name
+        self.columns = {
+            column.name: None for column in table.columns
+        }
+        if defaults:
+            self.columns.update(defaults)
+
+        self.rows = {}  # type: Dict[str, dict]
+        # column -> value -> primary key, None isn't indexed so
+        # many rows can leave a unique column empty.
+        self.unique = {
+            column: {} for column in unique
+        }  # type: Dict[str, Dict[object, str]]
+        # Primary keys in order, kept sorted on inserts & deletes.
+        self._ordered = []
+
+    def ordered(self) -> List[str]:
+        return self._ordered
+
+    def lookup(self, column: str, value: object) -> Optional[List[dict]]:
+        """Rows with the given value using a index,
+           None if the column isn't indexed.
+        """
+
+        if column == self.primary:
+            row = self.rows.get(value)
+        elif column in self.unique and value is not None:
+            row = self.rows.get(self.unique[column].get(value))
+        else:
+            return None
+
+        return [row] if row is not None else []
+
+    def find(self, and_: dict = None,
+             in_: Dict[str, list] = None) -> List[dict]:
+        """Rows matching all of the given columns & within
+           the given values.
+        """
+
+        and_ = and_ or {}
+        in_ = {
+            column: set(values) for column, values in (in_ or {}).items()
+        }
+
+        rows = None
+        for column, value in and_.items():
+            rows = self.lookup(column, value)
+            if rows is not None:
+                break
+
+        if rows is None:
+            for column, values in in_.items():
+                if column == self.primary or column in self.unique:
+                    rows = []
+                    for value in values:
+                        rows += self.lookup(column, value) or []
+                    break
+            else:
+                rows = self.rows.values()
+
+        return [row for row in rows if self.matches(row, and_, in_)]
+
+    @staticmethod
+    def matches(row: dict, and_: dict, in_: Dict[str, set]) -> bool:
+        return all(
+            row[column] == value for column, value in and_.items()
+        ) and all(
+            row[column] in values for column, values in in_.items()
+        )
+
+    def check_unique(self, values: dict, rows: List[dict] = None) -> None:
+        """
+        Raises
+        ------
+        DetailsExistError
+            Raised when a unique column is already used by a row
+            not within rows, or would be shared by many rows.
+        """
+
+        keys = {row[self.primary] for row in rows} if rows else set()
+
+        for column, value in values.items():
+            if value is None:
+                continue
+
+            if column == self.primary:
+                owner = value if value in self.rows else None
+            elif column in self.unique:
+                owner = self.unique[column].get(value)
+            else:
+                continue
+
+            if (owner is not None and owner not in keys) or len(keys) > 1:
+                raise DetailsExistError()
+
+    def put(self, row: dict) -> None:
+        key = row[self.primary]
+
+        previous = self.rows.get(key)
+        self._wrapper._record(self, key, previous)
+
+        if previous is None:
+            insort(self._ordered, key)
+
+        for column, index in self.unique.items():
+            if previous is not None and previous[column] is not None:
+                del index[previous[column]]
+            if row[column] is not None:
+                index[row[column]] = key
+
+        self.rows[key] = row
+
+    def remove(self, key: str) -> None:
+        row = self.rows.pop(key)
+        self._wrapper._record(self, key, row)
+        del self._ordered[bisect_left(self._ordered, key)]
+
+        for column, index in self.unique.items():
+            if row[column] is not None:
+                del index[row[column]]
+
+
+class _MemoryTransaction:
+    def __init__(self, wrapper: "MemoryWrapper") -> None:
+        self._wrapper = wrapper
+
+    async def __aenter__(self) -> None:
+        self._outer = self._wrapper._undo
+        self._wrapper._undo = []
+
+    async def __aexit__(self, exc_type, *args) -> None:
+        undo = self._wrapper._undo
+
+        if exc_type is None:
+            self._wrapper._undo = self._outer
+            if self._outer is not None:
+                self._outer += undo
+            return
+
+        # Undoing isn't recorded, as undone writes cancel out.
+        self._wrapper._undo = None
+        for table, key, previous in reversed(undo):
+            if previous is None:
+                table.remove(key)
+            else:
+                table.put(previous)
+        self._wrapper._undo = self._outer
+
+
+def _project(row: Mapping, columns: Iterable[str] = None) -> dict:
+    if columns is None:
+        return dict(row)
+
+    return {column: row[column] for column in columns}
+
+
+class MemoryWrapper:
+    """Stores rows within dicts, shaped like SQL rows.
+    """
+
+    _undo: Optional[List[Tuple[_MemoryTable, str, Optional[dict]]]]
+
+    def __init__(self, snapshot: str = None) -> None:
+        self._snapshot = snapshot
+        self._undo = None
+
+        self._tables = {
+            "user": _MemoryTable(
+                self, user_table, ("name", "email"), {"session_counter": 0}
+            ),
+            "outbox": _MemoryTable(self, outbox_table, ())
+        }
+
+    def _record(self, table: _MemoryTable, key: str,
+                previous: Optional[dict]) -> None:
+        if self._undo is not None:
+            self._undo.append((table, key, previous))
+
+    def load(self) -> None:
+        """Loads the snapshot if one exists.
+        """
+
+        if not self._snapshot or not os.path.exists(self._snapshot):
+            return
+
+        with open(self._snapshot, "rb") as file:
+            snapshot = pickle.load(file)
+
+        if snapshot.get("version") != _SNAPSHOT_VERSION:
+            raise ValueError(f"{self._snapshot} isn't a supported snapshot.")
+
+        for name, rows in snapshot["tables"].items():
+            table = self._tables[name]
+            for row in rows:
+                table.put({**table.columns, **row})
+
+    def save(self) -> None:
+        """Writes the snapshot, replacing the previous
+           snapshot once fully written.
+        """
+
+        if not self._snapshot:
+            return
+
+        with open(self._snapshot + ".tmp", "wb") as file:
+            pickle.dump({
+                "version": _SNAPSHOT_VERSION,
+                "tables": {
+                    name: list(table.rows.values())
+                    for name, table in self._tables.items()
+                }
+            }, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(self._snapshot + ".tmp", self._snapshot)
+
+    async def create_schema(self) -> None:
+        """Tables exist from creation, nothing to do.
+        """
+
+        pass
+
+    def transaction(self) -> _MemoryTransaction:
+        """Writes within the transaction are undone if it fails.
+           Writes never wait, so writes from other tasks can't
+           happen between them unless the transaction awaits
+           something else.
+        """
+
+        return _MemoryTransaction(self)
+
+    async def claim_outbox(self, batch_size: int, now: datetime,
+                           lease_until: datetime) -> List[Mapping]:
+        table = self._tables["outbox"]
+
+        messages = sorted(
+            (
+                row for row in table.rows.values()
+                if row["claimed_until"] is None or row["claimed_until"] < now
+            ),
+            key=lambda row: row["created"]
+        )[:batch_size]
+
+        claim = generate_id()
+        for row in messages:
+            table.put({
+                **row,
+                "claim": claim,
+                "claimed_until": lease_until,
+                # Snapshots from before attempts were counted.
+                "attempts": (row.get("attempts") or 0) + 1
+            })
+
+        return [
+            dict(table.rows[row["message_id"]]) for row in messages
+        ]
+
+    async def exists(self, table: str, or_: dict) -> bool:
+        return any(
+            self._tables[table].find({key: value})
+            for key, value in or_.items()
+        )
+
+    async def count(self, table: str, and_: dict = None,
+                    in_: Dict[str, list] = None) -> int:
+        if not and_ and not in_:
+            return len(self._tables[table].rows)
+
+        return len(self._tables[table].find(and_, in_))
+
+    async def user_stats(self, reset_after: datetime) -> Dict[str, int]:
+        rows = self._tables["user"].rows.values()
+
+        return {
+            "total": len(rows),
+            "confirmed": sum(
+                1 for row in rows if row["email_confirmed"] is True
+            ),
+            "pending_resets": sum(
+                1 for row in rows
+                if row["password_reset_generated"] is not None
+                and row["password_reset_generated"] > reset_after
+            )
+        }
+
+    async def delete(self, table: str,
+                     and_: dict) -> None:
+        await self.delete_many(table, and_)
+
+    async def delete_many(self, table: str, and_: dict = None,
+                          in_: Dict[str, list] = None) -> int:
+        """Deletes rows matching all of the given columns
+           & within the given values.
+
+        Returns
+        -------
+        int
+            Amount of rows deleted.
+        """
+
+        memory_table = self._tables[table]
+
+        rows = memory_table.find(and_, in_)
+        for row in rows:
+            memory_table.remove(row[memory_table.primary])
+
+        return len(rows)
+
+    async def update_many(self, table: str, values: dict,
+                          and_: dict = None,
+                          in_: Dict[str, list] = None) -> int:
+        """Updates rows matching all of the given columns
+           & within the given values.
+
+        Returns
+        -------
+        int
+            Amount of rows matched.
+
+        Raises
+        ------
+        DetailsExistError
+            Raised when a unique column is already used.
+        """
+
+        memory_table = self._tables[table]
+
+        rows = memory_table.find(and_, in_)
+        if rows:
+            memory_table.check_unique(values, rows)
+
+        for row in rows:
+            memory_table.put({**row, **values})
+
+        return len(rows)
+
+    async def update(self, table: str,
+                     and_: dict, values: dict) -> None:
+        """
+        Raises
+        ------
+        DetailsExistError
+            Raised when a unique column is already used.
+        """
+
+        await self.update_many(table, values, and_)
+
+    async def increment(self, table: str, and_: dict,
+                        column: str) -> None:
+        memory_table = self._tables[table]
+
+        for row in memory_table.find(and_):
+            memory_table.put({**row, column: (row[column] or 0) + 1})
+
+    async def insert(self, table: str,
+                     values: dict) -> None:
+        """
+        Raises
+        ------
+        DetailsExistError
+            Raised when a unique column is already used.
+        """
+
+        memory_table = self._tables[table]
+
+        memory_table.check_unique(values)
+        memory_table.put({**memory_table.columns, **values})
+
+    async def insert_many(self, table: str,
+                          values: List[dict]) -> List[int]:
+        """Inserts many rows.
+
+        Returns
+        -------
+        List[int]
+            Indexes of rows rejected for using a taken unique column.
+        """
+
+        rejected = []
+        for index, row in enumerate(values):
+            try:
+                await self.insert(table, row)
+            except DetailsExistError:
+                rejected.append(index)
+
+        return rejected
+
+    async def get_many(self, table: str, in_: Dict[str, list],
+                       columns: Iterable[str] = None) -> List[Mapping]:
+        """Gets rows where any of the given columns are
+           within the given values.
+        """
+
+        memory_table = self._tables[table]
+
+        rows = {}
+        for key, value in in_.items():
+            for row in memory_table.find(in_={key: value}):
+                rows[row[memory_table.primary]] = row
+
+        return [_project(row, columns) for row in rows.values()]
+
+    async def get(self, table, and_: dict,
+                  columns: Iterable[str] = None) -> Optional[Mapping]:
+        rows = self._tables[table].find(and_)
+
+        return _project(rows[0], columns) if rows else None
+
+    async def page(self, table: str, limit: int, after: str = None,
+                   and_: dict = None, descending: bool = False,
+                   columns: Iterable[str] = None,
+                   in_: Dict[str, list] = None) -> List[Mapping]:
+        """Gets rows ordered by user_id, starting after the given
+           user_id.
+        """
+
+        memory_table = self._tables[table]
+        ordered = memory_table.ordered()
+
+        and_ = and_ or {}
+        in_ = {
+            column: set(values) for column, values in (in_ or {}).items()
+        }
+
+        if descending:
+            end = len(ordered) if after is None else bisect_left(
+                ordered, after
+            )
+            keys = (ordered[index] for index in range(end - 1, -1, -1))
+        else:
+            start = 0 if after is None else bisect_right(ordered, after)
+            keys = (
+                ordered[index] for index in range(start, len(ordered))
+            )
+
+        rows = []
+        for key in keys:
+            row = memory_table.rows[key]
+            if not memory_table.matches(row, and_, in_):
+                continue
+
+            rows.append(_project(row, columns))
+            if len(rows) == limit:
+                break
+
+        return rows
+
+    async def __matching(self, table: str, and_: dict = None,
+                         in_: Dict[str, list] = None) -> List[dict]:
+        memory_table = self._tables[table]
+
+        if and_ or in_:
+            return sorted(
+                memory_table.find(and_, in_),
+                key=lambda row: row[memory_table.primary]
+            )
+
+        return [memory_table.rows[key] for key in memory_table.ordered()]
+
+    async def batches(self, table: str, batch_size: int,
+                      and_: dict = None, columns: Iterable[str] = None,
+                      in_: Dict[str, list] = None
+                      ) -> AsyncGenerator[List[Mapping], None]:
+        """Gets rows in lists of batch_size, rows are copied a
+           batch at a time from when iterating started.
+        """
+
+        rows = await self.__matching(table, and_, in_)
+        for start in range(0, len(rows), batch_size):
+            yield [
+                _project(row, columns)
+                for row in rows[start:start + batch_size]
+            ]
+
+    async def iterate(self, table: str, and_: dict = None,
+                      columns: Iterable[str] = None,
+                      in_: Dict[str, list] = None
+                      ) -> AsyncGenerator[Mapping, None]:
+        for row in await self.__matching(table, and_, in_):
+            yield _project(row, columns)
@@ -1,5 +1,7 @@
-from dataclasses import dataclass, fields
-from typing import Union
+from dataclasses import dataclass
+from typing import Mapping, Optional, Union
+
+from ._errors import AioAccountError
 
 
 @dataclass
@@ -14,13 +16,86 @@ class UserModel:
     email_confirmed : Union[None, bool]
     """
 
+    _FIELDS = ("user_id", "name", "email", "email_confirmed")
+
+    # Fields have no class level defaults, as they'd conflict
+    # with the slots. __init__ fills in None instead.
+    __slots__ = _FIELDS
+
     user_id: str
-    name: Union[None, str] = None
-    email: Union[None, str] = None
-    email_confirmed: Union[None, bool] = None
-
-    def __init__(self, **kwargs):
-        names = set([f.name for f in fields(self)])
-        for k, v in kwargs.items():
-            if k in names:
-                setattr(self, k, v)
+    name: Union[None, str]
+    email: Union[None, str]
+    email_confirmed: Union[None, bool]
+
+    def __init__(self, **kwargs) -> None:
+        for field in self._FIELDS:
+            setattr(self, field, kwargs.get(field))
+
+    @classmethod
+    def from_row(cls, row: Mapping) -> "UserModel":
+        """Builds a model from a database row or document,
+           columns besides the model's fields are ignored.
+
+        Parameters
+        ----------
+        row : Mapping
+
+        Returns
+        -------
+        UserModel
+        """
+
+        model = cls.__new__(cls)
+        for field in cls._FIELDS:
+            try:
+                value = row[field]
+            except KeyError:
+                value = None
+
+            setattr(model, field, value)
+
+        return model
+
+
+@dataclass
+class AccountResult:
+    """Result of a account given to 'create_accounts'.
+
+    Attributes
+    ----------
+    index : int
+        Position of the account within the given accounts.
+    user_id : Optional[str]
+        Set if the account was created.
+    error : Optional[AioAccountError]
+        Set if the account wasn't created.
+    """
+
+    index: int
+    user_id: Optional[str] = None
+    error: Optional[AioAccountError] = None
+
+    @property
+    def created(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class UserStats:
+    """Account statistics given by 'stats'.
+
+    Attributes
+    ----------
+    total : int
+    confirmed : int
+        Users with a confirmed email.
+    unconfirmed : int
+        Users without a confirmed email.
+    pending_resets : int
+        Users with a password reset code which hasn't expired.
+    """
+
+    total: int
+    confirmed: int
+    unconfirmed: int
+    pending_resets: int
@@ -1,5 +1,29 @@
-from typing import AsyncGenerator, Mapping, Optional
+import asyncio
+
+from datetime import datetime
+from typing import (
+    AsyncContextManager,
+    AsyncGenerator,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional
+)
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+
+from ._errors import DetailsExistError
+from ._util import generate_id
+
+
+class _NoTransaction:
+    async def __aenter__(self) -> None:
+        pass
+
+    async def __aexit__(self, *args) -> None:
+        pass
 
 
 class MongoWrapper:
@@ -10,32 +34,279 @@ class MongoWrapper:
     def __init__(self, db: AsyncIOMotorClient) -> None:
         self._db = db
 
+    async def create_schema(self) -> None:
+        """Creates needed indexes, does nothing if they already exist.
+        """
+
+        await self._db.user.create_index("user_id", unique=True)
+
+        # Sparse so users without a name or email don't conflict.
+        for key in ("name", "email"):
+            await self._db.user.create_index(key, unique=True, sparse=True)
+
+        for key in ("email_vaildate", "password_reset_code",
+                    "password_reset_generated"):
+            await self._db.user.create_index(key, sparse=True)
+
+        await self._db.user.create_index("email_confirmed")
+
+        await self._db.outbox.create_index("message_id", unique=True)
+        for key in ("created", "claim", "claimed_until"):
+            await self._db.outbox.create_index(key)
+
+    def transaction(self) -> AsyncContextManager:
+        """Mongo only supports transactions on replica sets,
+           so writes are made one after another.
+        """
+
+        return _NoTransaction()
+
+    async def claim_outbox(self, batch_size: int, now: datetime,
+                           lease_until: datetime) -> List[Mapping]:
+        """Claims unclaimed or expired outbox messages until
+           lease_until, safe to call from many processes.
+           Each claim counts as an attempt.
+        """
+
+        expired = {"$or": [
+            {"claimed_until": None},
+            {"claimed_until": {"$lt": now}}
+        ]}
+
+        message_ids = [
+            document["message_id"] async for document in self._db.outbox.find(
+                expired, {"_id": False, "message_id": True}
+            ).sort("created", ASCENDING).limit(batch_size)
+        ]
+        if not message_ids:
+            return []
+
+        # Only messages still unclaimed get this claim, so messages
+        # claimed by another process in between aren't returned.
+        claim = generate_id()
+        await self._db.outbox.update_many(
+            {"message_id": {"$in": message_ids}, **expired},
+            {
+                "$set": {"claim": claim, "claimed_until": lease_until},
+                "$inc": {"attempts": 1}
+            }
+        )
+
+        return await self._db.outbox.find(
+            {"claim": claim}, {"_id": False}
+        ).to_list(None)
+
     async def exists(self, table: str, or_: dict) -> bool:
+        return await self._db[table].find_one(
+            {"$or": [{key: value} for key, value in or_.items()]},
+            {"_id": 1}
+        ) is not None
+
+    def __projection(self, columns: Iterable[str] = None
+                     ) -> Optional[dict]:
+        if columns is None:
+            return None
+
+        return {"_id": False, **{column: True for column in columns}}
+
+    def __where(self, and_: dict = None,
+                in_: Dict[str, list] = None) -> dict:
+        where = dict(and_) if and_ else {}
+        if in_:
+            for key, value in in_.items():
+                where[key] = {"$in": value}
+
+        return where
+
+    async def count(self, table: str, and_: dict = None,
+                    in_: Dict[str, list] = None) -> int:
         return await self._db[table].count_documents(
-            {"$or": [{key: value} for key, value in or_.items()]}
-        ) != 0
+            self.__where(and_, in_)
+        )
+
+    async def user_stats(self, reset_after: datetime) -> Dict[str, int]:
+        """Counts users, confirmed users & reset codes generated
+           after the given time.
+        """
+
+        total, confirmed, pending_resets = await asyncio.gather(
+            self._db.user.count_documents({}),
+            self._db.user.count_documents({"email_confirmed": True}),
+            self._db.user.count_documents({
+                "password_reset_generated": {"$gt": reset_after}
+            })
+        )
+
+        return {
+            "total": total,
+            "confirmed": confirmed,
+            "pending_resets": pending_resets
+        }
 
     async def delete(self, table: str,
                      and_: dict) -> None:
         await self._db[table].delete_many(and_)
 
+    async def delete_many(self, table: str, and_: dict = None,
+                          in_: Dict[str, list] = None) -> int:
+        """Deletes documents matching all of the given fields
+           & within the given values.
+
+        Returns
+        -------
+        int
+            Amount of documents deleted.
+        """
+
+        result = await self._db[table].delete_many(self.__where(and_, in_))
+        return result.deleted_count
+
+    async def update_many(self, table: str, values: dict,
+                          and_: dict = None,
+                          in_: Dict[str, list] = None) -> int:
+        """Updates documents matching all of the given fields
+           & within the given values.
+
+        Returns
+        -------
+        int
+            Amount of documents matched.
+        """
+
+        result = await self._db[table].update_many(
+            self.__where(and_, in_), {"$set": values}
+        )
+        return result.matched_count
+
     async def update(self, table: str,
                      and_: dict, values: dict) -> None:
-        await self._db[table].update_one(
-            and_,
-            {"$set": values}
-        )
+        """
+        Raises
+        ------
+        DetailsExistError
+            Raised when a unique field is already used.
+        """
+
+        try:
+            await self._db[table].update_one(
+                and_,
+                {"$set": values}
+            )
+        except DuplicateKeyError:
+            raise DetailsExistError()
+
+    async def increment(self, table: str, and_: dict,
+                        column: str) -> None:
+        await self._db[table].update_one(and_, {"$inc": {column: 1}})
 
     async def insert(self, table: str,
                      values: dict) -> None:
-        await self._db[table].insert_one(values)
+        """
+        Raises
+        ------
+        DetailsExistError
+            Raised when a unique field is already used.
+        """
+
+        try:
+            await self._db[table].insert_one(values)
+        except DuplicateKeyError:
+            raise DetailsExistError()
+
+    async def insert_many(self, table: str,
+                          values: List[dict]) -> List[int]:
+        """Inserts many documents within a single unordered write.
+
+        Returns
+        -------
+        List[int]
+            Indexes of documents rejected for using a taken
+            unique field.
+        """
+
+        try:
+            await self._db[table].insert_many(values, ordered=False)
+        except BulkWriteError as error:
+            rejected = []
+            for write_error in error.details["writeErrors"]:
+                if write_error["code"] != 11000:
+                    raise
+                rejected.append(write_error["index"])
+
+            return rejected
 
-    async def get(self, table, and_: dict) -> Optional[Mapping]:
-        return await self._db[table].find_one(and_)
+        return []
 
-    async def iterate(self, table: str, and_: dict = None
+    async def get_many(self, table: str, in_: Dict[str, list],
+                       columns: Iterable[str] = None) -> List[Mapping]:
+        """Gets documents where any of the given fields are
+           within the given values.
+        """
+
+        return await self._db[table].find({
+            "$or": [
+                {key: {"$in": value}} for key, value in in_.items()
+            ]
+        }, self.__projection(columns)).to_list(None)
+
+    async def get(self, table, and_: dict,
+                  columns: Iterable[str] = None) -> Optional[Mapping]:
+        return await self._db[table].find_one(
+            and_, self.__projection(columns)
+        )
+
+    async def page(self, table: str, limit: int, after: str = None,
+                   and_: dict = None, descending: bool = False,
+                   columns: Iterable[str] = None,
+                   in_: Dict[str, list] = None) -> List[Mapping]:
+        """Gets documents ordered by user_id, starting after the
+           given user_id.
+        """
+
+        where = self.__where(and_, in_)
+        if after is not None:
+            where["user_id"] = {"$lt" if descending else "$gt": after}
+
+        return await self._db[table].find(
+            where, self.__projection(columns)
+        ).sort(
+            "user_id", DESCENDING if descending else ASCENDING
+        ).limit(limit).to_list(None)
+
+    async def batches(self, table: str, batch_size: int,
+                      and_: dict = None, columns: Iterable[str] = None,
+                      in_: Dict[str, list] = None
+                      ) -> AsyncGenerator[List[Mapping], None]:
+        """Gets documents in lists of batch_size, using batch_size
+           as the cursor's fetch size. Missing columns are set to
+           None so documents are shaped like SQL rows.
+        """
+
+        find = self._db[table].find(
+            self.__where(and_, in_), self.__projection(columns)
+        ).batch_size(batch_size)
+
+        batch = []
+        async for document in find:
+            if columns is not None:
+                for column in columns:
+                    document.setdefault(column, None)
+
+            batch.append(document)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    async def iterate(self, table: str, and_: dict = None,
+                      columns: Iterable[str] = None,
+                      in_: Dict[str, list] = None
                       ) -> AsyncGenerator[Mapping, None]:
-        find = self._db[table].find(and_) if and_ else self._db[table].find()
+        find = self._db[table].find(
+            self.__where(and_, in_), self.__projection(columns)
+        )
 
         async for document in find:
             yield document
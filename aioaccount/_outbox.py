@@ -0,0 +1,172 @@
+import asyncio
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional, Union
+
+from ._util import generate_id
+
+if TYPE_CHECKING:
+    from ._sql import SqlWrapper
+    from ._mongo import MongoWrapper
+    from ._memory import MemoryWrapper
+    from ._smtp import SmtpClient
+
+_Wrapper = Union["SqlWrapper", "MongoWrapper", "MemoryWrapper"]
+
+
+class Outbox:
+    _task: Optional["asyncio.Task[None]"]
+    _stopping: Optional[asyncio.Event]
+
+    def __init__(self, batch_size: int = 100, interval: float = 1.0,
+                 lease: float = 300.0, max_attempts: int = 5) -> None:
+        """Stores emails within the database before they're sent,
+           so emails survive restarts.
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            Max amount of emails claimed at once, by default 100
+        interval : float, optional
+            Seconds between checks when the outbox is empty,
+            by default 1.0
+        lease : float, optional
+            Seconds a claimed email is held before another worker
+            can claim it, by default 300.0
+        max_attempts : int, optional
+            Times an email is claimed before it's dropped,
+            by default 5
+
+        Notes
+        -----
+        Emails are sent at least once, an email claimed by a
+        worker which stopped before removing it is sent again
+        once its lease ends. Emails still failing after
+        max_attempts are removed & passed to the event loop's
+        exception handler.
+
+        Email codes are stored unhashed until the email is sent.
+        """
+
+        self._batch_size = batch_size
+        self._interval = interval
+        self._lease = timedelta(seconds=lease)
+        self._max_attempts = max_attempts
+
+        self._task = None
+        self._stopping = None
+
+    def _message(self, email: str, code: str, type_: str) -> dict:
+        return {
+            "message_id": generate_id(),
+            "email": email,
+            "code": code,
+            "type": type_,
+            "created": datetime.now(),
+            "claim": None,
+            "claimed_until": None,
+            "attempts": 0
+        }
+
+    async def _drain(self, db_wrapper: _Wrapper, smtp: "SmtpClient") -> int:
+        """Sends a batch of emails.
+
+        Returns
+        -------
+        int
+            Amount of emails claimed.
+        """
+
+        now = datetime.now()
+        messages = await db_wrapper.claim_outbox(
+            self._batch_size, now, now + self._lease
+        )
+
+        loop = asyncio.get_event_loop()
+
+        sending = []
+        for message in messages:
+            sent = loop.create_future()
+            await smtp._enqueue(
+                message["email"], message["code"], message["type"], sent
+            )
+            sending.append(sent)
+
+        # Emails which failed stay claimed & are retried after the
+        # lease, unless they've been attempted too many times.
+        done_ids = []
+        for message, sent in zip(messages, await asyncio.gather(*sending)):
+            if sent:
+                done_ids.append(message["message_id"])
+            elif message["attempts"] >= self._max_attempts:
+                done_ids.append(message["message_id"])
+                loop.call_exception_handler({
+                    "message": (
+                        f"Dropped outbox email {message['message_id']} "
+                        f"after {message['attempts']} attempts"
+                    )
+                })
+
+        if done_ids:
+            await db_wrapper.delete_many(
+                "outbox", in_={"message_id": done_ids}
+            )
+
+        return len(messages)
+
+    async def __worker(self, db_wrapper: _Wrapper, smtp: "SmtpClient",
+                       stopping: asyncio.Event) -> None:
+        while not stopping.is_set():
+            try:
+                claimed = await self._drain(db_wrapper, smtp)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                claimed = 0
+                asyncio.get_event_loop().call_exception_handler({
+                    "message": "Draining email outbox failed",
+                    "exception": error
+                })
+
+            # A full batch means more emails are likely waiting.
+            if claimed < self._batch_size:
+                try:
+                    await asyncio.wait_for(stopping.wait(), self._interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def start(self, db_wrapper: _Wrapper, smtp: "SmtpClient") -> None:
+        """Starts the worker, called by 'AccountHandler.start'.
+        """
+
+        self._stopping = asyncio.Event()
+        self._task = asyncio.ensure_future(
+            self.__worker(db_wrapper, smtp, self._stopping)
+        )
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Stops the worker once the batch being sent is handled,
+           called by 'AccountHandler.close'.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for the batch being sent, the worker
+            is cancelled afterwards, by default 10.0
+
+        Notes
+        -----
+        Cancelling the worker within a query can leave the
+        database connection it shares unusable, so the worker
+        is only cancelled after the timeout.
+        """
+
+        if self._task:
+            self._stopping.set()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), timeout)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+
+            self._task = None
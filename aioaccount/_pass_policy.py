@@ -1,5 +1,7 @@
 from password_strength import PasswordPolicy as ExtPP
 
+from ._breach import BreachedPasswords
+
 
 class PasswordPolicy:
     def __init__(self, length: int = 8,
@@ -7,6 +9,7 @@ class PasswordPolicy:
                  numbers: int = 2,
                  special: int = 2,
                  nonletters: int = 2,
+                 breached: BreachedPasswords = None,
                  **kwargs) -> None:
         """Used to set password policy.
 
@@ -25,6 +28,9 @@ class PasswordPolicy:
         nonletters : int, optional
             Min number of non letter characters,
             by default 2
+        breached : BreachedPasswords, optional
+            Rejects passwords found within the breach file,
+            by default None
         """
 
         self._policy = ExtPP.from_names(
@@ -35,3 +41,5 @@ class PasswordPolicy:
             nonletters=nonletters,
             **kwargs
         )
+
+        self._breached = breached
@@ -0,0 +1,125 @@
+import hmac
+
+from collections import OrderedDict
+from time import monotonic, time
+from typing import Mapping, Optional, Tuple
+
+from ._errors import SessionInvalid
+from ._util import code_digest
+
+
+def _row_counter(row: Mapping) -> int:
+    # Documents created before sessions existed have no counter.
+    try:
+        return row["session_counter"] or 0
+    except KeyError:
+        return 0
+
+
+class Sessions:
+    _counters: "OrderedDict[str, Tuple[float, int]]"
+
+    def __init__(self, key: bytes, expires: float = 86400.0,
+                 counter_ttl: float = 60.0,
+                 max_users: int = 100000) -> None:
+        """Signed session tokens issued by 'login_session', tokens
+           are checked without hashing passwords.
+
+        Parameters
+        ----------
+        key : bytes
+            Key tokens are signed with, must be kept secret &
+            shared between processes.
+        expires : float, optional
+            Seconds a token is valid for, by default 86400.0
+        counter_ttl : float, optional
+            Seconds a user's session counter is cached for, 0 reads
+            the counter from the database on every verify,
+            by default 60.0
+        max_users : int, optional
+            Max amount of session counters cached, least recently
+            used are forgotten first, by default 100000
+
+        Notes
+        -----
+        Tokens are revoked by bumping the user's session counter.
+        Revocations made by this process are seen at once, other
+        processes keep accepting revoked tokens for up to
+        counter_ttl seconds, until their cached counter expires.
+        """
+
+        if not key:
+            raise ValueError("A session key must be given.")
+
+        self._key = key
+        self._expires = expires
+        self._counter_ttl = counter_ttl
+        self._max_users = max_users
+
+        # user_id -> (expires, counter)
+        self._counters = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def _issue(self, user_id: str, counter: int) -> str:
+        payload = f"{user_id}.{int(time())}.{counter}"
+        self._cache(user_id, counter)
+
+        return f"{payload}.{code_digest(payload, self._key)}"
+
+    def _verify(self, token: str) -> Tuple[str, int]:
+        """Checks a token's signature & expiry.
+
+        Returns
+        -------
+        str
+            User ID.
+        int
+            Session counter the token was issued with.
+
+        Raises
+        ------
+        SessionInvalid
+        """
+
+        payload, _, signature = token.rpartition(".")
+        if not hmac.compare_digest(
+                code_digest(payload, self._key).encode(),
+                signature.encode()):
+            raise SessionInvalid()
+
+        user_id, issued, counter = payload.split(".")
+        if int(issued) + self._expires < time():
+            raise SessionInvalid()
+
+        return user_id, int(counter)
+
+    def _counter(self, user_id: str) -> Optional[int]:
+        cached = self._counters.get(user_id)
+        if cached is None:
+            return None
+
+        expires, counter = cached
+        if expires < monotonic():
+            del self._counters[user_id]
+            return None
+
+        self._counters.move_to_end(user_id)
+        return counter
+
+    def _cache(self, user_id: str, counter: int) -> None:
+        if self._counter_ttl <= 0:
+            return
+
+        self._counters[user_id] = (monotonic() + self._counter_ttl, counter)
+        self._counters.move_to_end(user_id)
+
+        if len(self._counters) > self._max_users:
+            self._counters.popitem(last=False)
+
+    def _forget(self, user_id: str = None) -> None:
+        if user_id is None:
+            self._counters.clear()
+        else:
+            self._counters.pop(user_id, None)
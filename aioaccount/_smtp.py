@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+import asyncio
 import aiosmtplib
 
+from time import monotonic
+from typing import List, Optional, Tuple, Union
 from email.mime.text import MIMEText
 from email.message import EmailMessage
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import (
+    BytecodeCache,
+    Environment,
+    FileSystemLoader,
+    Template,
+    select_autoescape
+)
+
+from ._errors import SmtpNotStarted
 
 
 class SmtpHtml:
+    _template: Optional[Template]
+
     def __init__(self, path: str, file: str,
-                 url_key: str = "url") -> None:
+                 url_key: str = "url", auto_reload: bool = False,
+                 bytecode_cache: BytecodeCache = None,
+                 enable_async: bool = False) -> None:
         """Configure SMTP html template
 
         Parameters
@@ -21,19 +36,66 @@ class SmtpHtml:
         url_key : str, optional
             Key for validation email url,
             by default "url"
+        auto_reload : bool, optional
+            Reload the template when the file changes, otherwise
+            the template is compiled once, by default False
+        bytecode_cache : BytecodeCache, optional
+            jinja2 bytecode cache for compiled templates,
+            by default None
+        enable_async : bool, optional
+            Render using jinja2's async mode, by default False
         """
 
         self._jinja2 = Environment(
             loader=FileSystemLoader(path),
-            autoescape=select_autoescape(["html", "xml"])
+            autoescape=select_autoescape(["html", "xml"]),
+            auto_reload=auto_reload,
+            bytecode_cache=bytecode_cache,
+            enable_async=enable_async
         )
 
         self._file = file
         self._url_key = url_key
+        self._auto_reload = auto_reload
+        self._template = None
+
+    def _compile(self) -> None:
+        """Compiles the template, called when given to a layout.
+        """
+
+        self._template = self._jinja2.get_template(self._file)
+
+    async def _render(self, link: str) -> str:
+        if self._template is None or self._auto_reload:
+            self._compile()
+
+        if self._jinja2.is_async:
+            return await self._template.render_async(
+                {self._url_key: link}
+            )
+
+        return self._template.render({self._url_key: link})
+
+
+def _split_on(format_: str, key: str) -> List[str]:
+    # Splits a format string on a key, so the key's value only
+    # needs to be joined between the parts.
+    return format_.format(**{key: "\0"}).split("\0")
 
 
 class SmtpClient:
+    _idle: List[Tuple[float, aiosmtplib.SMTP]]
+    _slots: Optional[asyncio.Semaphore]
+    _queue: Optional[
+        "asyncio.Queue[Tuple[float, str, str, str, Optional[asyncio.Future]]]"
+    ]
+    _senders: List["asyncio.Task[None]"]
+
     def __init__(self, host: str, port: int, email: str,
+                 pool_size: int = 4, keepalive: float = 30.0,
+                 queue_size: int = 1000, senders: int = None,
+                 rate: float = None, burst: int = 1,
+                 retries: int = 3, retry_delay: float = 1.0,
                  **kwargs) -> None:
         """Used to configure SMTP.
 
@@ -43,6 +105,26 @@ class SmtpClient:
         port : int
         email : str
             Email address to send as.
+        pool_size : int, optional
+            Max amount of open connections, by default 4
+        keepalive : float, optional
+            Seconds a connection can be idle before it's checked
+            with NOOP when reused, by default 30.0
+        queue_size : int, optional
+            Max amount of emails waiting to be sent, queuing
+            waits for space once reached, by default 1000
+        senders : int, optional
+            Amount of emails sent at once, by default pool_size
+        rate : float, optional
+            Max emails sent per second, by default None
+        burst : int, optional
+            Emails which can be sent at once within the rate,
+            by default 1
+        retries : int, optional
+            Times a failed email is retried, by default 3
+        retry_delay : float, optional
+            Seconds before the first retry, doubled for each
+            following retry, by default 1.0
 
         Notes
         -----
@@ -60,25 +142,73 @@ class SmtpClient:
 
         self._email = email
 
+        self._pool_size = pool_size
+        self._keepalive = keepalive
+
+        # Most recently released connections are reused first.
+        self._idle = []
+        self._slots = None
+
+        self._queue_size = queue_size
+        self._sender_count = senders or pool_size
+        self._rate = rate
+        self._burst = burst
+        self._retries = retries
+        self._retry_delay = retry_delay
+
+        self._queue = None
+        self._senders = []
+
+        self._tokens = float(burst)
+        self._refilled = monotonic()
+
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._latency_total = 0.0
+
         self._email_types = {
             "confirm": {
-                "raw": "Please confirm your email\n{link}",
-                "raw_place": True,
+                "url": ["", ""],
+                "raw": _split_on(
+                    "Please confirm your email\n{link}", "link"
+                ),
                 "html": None,
-                "subject": "Please confirm your email!",
-                "url": "",
-                "contains_code": False
+                "subject": "Please confirm your email!"
             },
             "reset": {
-                "raw": "Follow this link to reset your password\n{link}",
-                "raw_place": True,
+                "url": ["", ""],
+                "raw": _split_on(
+                    "Follow this link to reset your password\n{link}",
+                    "link"
+                ),
                 "html": None,
-                "subject": "Password reset request",
-                "url": "",
-                "contains_code": False
+                "subject": "Password reset request"
             }
         }
 
+    def __layout(self, type_: str, url: str, html: Optional[SmtpHtml],
+                 raw: Optional[str], subject: Optional[str]) -> None:
+        email_type = self._email_types[type_]
+
+        if "{validation_code}" in url:
+            email_type["url"] = _split_on(url, "validation_code")
+        else:
+            email_type["url"] = [url, ""]
+
+        if raw:
+            if "{link}" in raw:
+                email_type["raw"] = _split_on(raw, "link")
+            else:
+                email_type["raw"] = [raw, ""]
+
+        if html:
+            html._compile()
+            email_type["html"] = html
+
+        if subject:
+            email_type["subject"] = subject
+
     def confirm_layout(self, url: str, html: SmtpHtml = None,
                        raw: str = None, subject: str = None
                        ) -> SmtpClient:
@@ -109,23 +239,7 @@ class SmtpClient:
         SmtpClient
         """
 
-        self._email_types["confirm"]["url"] = url
-        self._email_types["confirm"][
-            "contains_code"
-        ] = "{validation_code}" in url
-
-        if raw:
-            self._email_types["confirm"]["raw"] = raw
-            self._email_types["confirm"]["raw_place"] = (
-                "{link}" in raw
-                if raw else False
-            )
-
-        if html:
-            self._email_types["confirm"]["html"] = html
-
-        if subject:
-            self._email_types["confirm"]["subject"] = subject
+        self.__layout("confirm", url, html, raw, subject)
 
         return self
 
@@ -159,25 +273,201 @@ class SmtpClient:
         SmtpClient
         """
 
-        self._email_types["confirm"]["url"] = url
-        self._email_types["confirm"][
-            "contains_code"
-        ] = "{validation_code}" in url
+        self.__layout("reset", url, html, raw, subject)
 
-        if raw:
-            self._email_types["reset"]["raw"] = raw
-            self._email_types["reset"]["raw_place"] = (
-                "{link}" in raw
-                if raw else False
+        return self
+
+    async def __acquire(self) -> aiosmtplib.SMTP:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._pool_size)
+
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                released, connection = self._idle.pop()
+                if not connection.is_connected:
+                    continue
+
+                if monotonic() - released < self._keepalive:
+                    return connection
+
+                try:
+                    await connection.noop()
+                except aiosmtplib.SMTPException:
+                    connection.close()
+                else:
+                    return connection
+
+            connection = aiosmtplib.SMTP(**self._details)
+            await connection.connect()
+
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def __release(self, connection: aiosmtplib.SMTP, reuse: bool) -> None:
+        if reuse and connection.is_connected:
+            self._idle.append((monotonic(), connection))
+        else:
+            connection.close()
+
+        self._slots.release()
+
+    async def _deliver(self, message: Union[EmailMessage, MIMEText]
+                       ) -> None:
+        """Sends a message over a pooled connection.
+        """
+
+        # Servers drop idle connections, a send failing on the
+        # connection is retried once on a new connection.
+        for attempt in range(2):
+            connection = await self.__acquire()
+            try:
+                await connection.send_message(message)
+            except (ConnectionError, aiosmtplib.SMTPTimeoutError):
+                self.__release(connection, False)
+                if attempt:
+                    raise
+            except BaseException:
+                self.__release(connection, False)
+                raise
+            else:
+                self.__release(connection, True)
+                return
+
+    @property
+    def pending(self) -> int:
+        """Emails waiting to be sent.
+        """
+
+        return self._queue.qsize() if self._queue else 0
+
+    @property
+    def latency(self) -> float:
+        """Average seconds between an email being queued & sent.
+        """
+
+        return self._latency_total / self.sent if self.sent else 0.0
+
+    async def start(self) -> None:
+        """Starts the senders, called by 'AccountHandler.start'.
+        """
+
+        if self._senders:
+            return
+
+        self._queue = asyncio.Queue(self._queue_size)
+        self._senders = [
+            asyncio.ensure_future(self.__sender())
+            for _ in range(self._sender_count)
+        ]
+
+    async def __take_token(self) -> None:
+        if self._rate is None:
+            return
+
+        while True:
+            now = monotonic()
+            self._tokens = min(
+                self._burst,
+                self._tokens + (now - self._refilled) * self._rate
             )
+            self._refilled = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    async def __sender(self) -> None:
+        while True:
+            queued, email, code, type_, sent = await self._queue.get()
+            delivered = False
+            try:
+                for attempt in range(self._retries + 1):
+                    await self.__take_token()
+
+                    try:
+                        await self._send(email, code, type_)
+                    except Exception as error:
+                        if attempt == self._retries:
+                            self.failed += 1
+                            asyncio.get_event_loop().call_exception_handler({
+                                "message": f"Sending {type_} email failed",
+                                "exception": error
+                            })
+                        else:
+                            self.retried += 1
+                            await asyncio.sleep(
+                                self._retry_delay * 2 ** attempt
+                            )
+                    else:
+                        self.sent += 1
+                        self._latency_total += monotonic() - queued
+                        delivered = True
+                        break
+            finally:
+                if sent is not None and not sent.done():
+                    sent.set_result(delivered)
+
+                self._queue.task_done()
+
+    async def _enqueue(self, email: str, code: str, type_: str,
+                       sent: asyncio.Future = None) -> None:
+        """Queues a email, waits for space if the queue is full.
 
-        if html:
-            self._email_types["reset"]["html"] = html
+        Parameters
+        ----------
+        email : str
+        code : str
+        type_ : str
+            email type
+        sent : asyncio.Future, optional
+            Set to if the email was sent once it's been handled,
+            by default None
 
-        if subject:
-            self._email_types["reset"]["subject"] = subject
+        Raises
+        ------
+        SmtpNotStarted
+        """
 
-        return self
+        if not self._senders:
+            raise SmtpNotStarted()
+
+        await self._queue.put((monotonic(), email, code, type_, sent))
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Sends queued emails & closes pooled connections.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for queued emails to be sent,
+            emails still queued afterwards are dropped,
+            by default 10.0
+        """
+
+        if self._senders:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            for sender in self._senders:
+                sender.cancel()
+
+            await asyncio.gather(*self._senders, return_exceptions=True)
+            self._senders = []
+            self._queue = None
+
+        idle, self._idle = self._idle, []
+        for _, connection in idle:
+            try:
+                await connection.quit()
+            except aiosmtplib.SMTPException:
+                connection.close()
 
     async def _send(self, email: str, code: str, type_: str) -> None:
         """Used to send a email.
@@ -192,30 +482,18 @@ class SmtpClient:
 
         email_type = self._email_types[type_]
 
-        if email_type["contains_code"]:
-            link = email_type["url"].format(validation_code=code)
-        else:
-            link = email_type["url"] + code
+        link = code.join(email_type["url"])
 
         if email_type["html"]:
-            message = MIMEText(email_type["html"]._jinja2.get_template(
-                email_type["html"]._file
-            ).render({email_type["html"]._url_key: link}), "html", "utf-8")
+            message = MIMEText(
+                await email_type["html"]._render(link), "html", "utf-8"
+            )
         else:
             message = EmailMessage()
-
-            if email_type["raw"]:
-                if email_type["raw_place"]:
-                    content = email_type["raw"].format(link=link)
-                else:
-                    content = email_type["raw"] + link
-            else:
-                content = link
-
-            message.set_content(content)
+            message.set_content(link.join(email_type["raw"]))
 
         message["From"] = self._email
         message["To"] = email
         message["Subject"] = email_type["subject"]
 
-        await aiosmtplib.send(message, **self._details)
+        await self._deliver(message)
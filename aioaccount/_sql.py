@@ -1,4 +1,15 @@
-from typing import AsyncGenerator, Mapping, Optional
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional
+)
 from sqlalchemy import (
     MetaData,
     Table,
@@ -6,17 +17,23 @@ from sqlalchemy import (
     Binary,
     String,
     Boolean,
+    Integer,
     func,
     select,
     and_ as sql_and,
     or_ as sql_or,
-    create_engine,
+    text,
+    true,
     TIMESTAMP
 )
 
+from sqlalchemy.schema import CreateTable, CreateIndex
 from databases import Database
+from datetime import datetime
 
 from ._const import _MAX_NAME_LEN
+from ._errors import DetailsExistError
+from ._util import generate_id
 
 
 metadata = MetaData()
@@ -32,60 +49,194 @@ user_table = Table(
     Column(
         "name",
         String(length=_MAX_NAME_LEN),
-        nullable=True
+        nullable=True,
+        unique=True,
+        index=True
     ),
     Column(
         "email",
         String(length=255),
-        nullable=True
+        nullable=True,
+        unique=True,
+        index=True
     ),
     Column(
         "email_vaildate",
         String(length=43),  # secrets.token_urlsafe(32)
-        nullable=True
+        nullable=True,
+        index=True
     ),
     Column(
         "password_reset_code",
         String(length=43),  # secrets.token_urlsafe(32)
-        nullable=True
+        nullable=True,
+        index=True
     ),
     Column(
         "password_reset_generated",
         TIMESTAMP,
-        nullable=True
+        nullable=True,
+        index=True
     ),
     Column(
         "email_confirmed",
         Boolean(),
-        nullable=True
+        nullable=True,
+        index=True
     ),
     Column(
         "password",
         Binary()
     ),
+    Column(
+        "session_counter",
+        Integer,
+        nullable=False,
+        server_default="0"
+    ),
     mysql_engine="InnoDB",
     mysql_charset="utf8mb4"
 )
 
+outbox_table = Table(
+    "aioaccount_outbox",
+    metadata,
+    Column(
+        "message_id",
+        String(length=32),
+        primary_key=True
+    ),
+    Column(
+        "email",
+        String(length=255)
+    ),
+    Column(
+        "code",
+        String(length=43)  # secrets.token_urlsafe(32)
+    ),
+    Column(
+        "type",
+        String(length=16)
+    ),
+    Column(
+        "created",
+        TIMESTAMP,
+        index=True
+    ),
+    Column(
+        "claim",
+        String(length=32),
+        nullable=True,
+        index=True
+    ),
+    Column(
+        "claimed_until",
+        TIMESTAMP,
+        nullable=True,
+        index=True
+    ),
+    Column(
+        "attempts",
+        Integer,
+        nullable=False,
+        server_default="0"
+    ),
+    mysql_engine="InnoDB",
+    mysql_charset="utf8mb4"
+)
 
-def create_tables(url: str) -> None:
-    if "mysql" in url:
-        old_engine = "mysql"
-        engine = "pymysql"
-    elif "sqlite" in url:
-        old_engine = "sqlite"
-        engine = "sqlite3"
-    elif "postgresql" in url:
-        old_engine = "postgresql"
-        engine = "psycopg2"
-    else:
-        assert False, "Invalid database URL engine."
-
-    metadata.create_all(
-        create_engine(url.replace(old_engine, f"{old_engine}+{engine}"))
+schema_table = Table(
+    "aioaccount_schema",
+    metadata,
+    Column(
+        "version",
+        Integer,
+        primary_key=True
+    ),
+    mysql_engine="InnoDB",
+    mysql_charset="utf8mb4"
+)
+
+
+def _is_integrity_error(error: Exception) -> bool:
+    # Each database driver raises its own exception.
+    return any(
+        cls.__name__ in ("IntegrityError", "UniqueViolationError")
+        for cls in type(error).__mro__
     )
 
 
+def _is_exists_error(error: Exception) -> bool:
+    # Each database driver raises its own exception & message.
+    message = str(error).lower()
+    return any(
+        cls.__name__ in ("DuplicateTableError", "DuplicateObjectError",
+                         "DuplicateColumnError")
+        for cls in type(error).__mro__
+    ) or any(
+        text_ in message for text_ in ("already exists", "duplicate column",
+                                       "duplicate key name")
+    )
+
+
+async def _execute_ddl(db: Database, statement: Any) -> None:
+    """Executes DDL, ignoring it if another worker already has.
+    """
+
+    try:
+        await db.execute(statement)
+    except Exception as error:
+        if not _is_exists_error(error):
+            raise
+
+
+async def _create_table(db: Database, table: Table) -> None:
+    await _execute_ddl(db, CreateTable(table))
+    for index in table.indexes:
+        await _execute_ddl(db, CreateIndex(index))
+
+
+async def _create_outbox_table(db: Database) -> None:
+    await _create_table(db, outbox_table)
+
+
+def _add_counter(table: Table, column: str
+                 ) -> Callable[[Database], Awaitable[None]]:
+    async def migration(db: Database) -> None:
+        quote = "`" if db.url.dialect == "mysql" else '"'
+        await _execute_ddl(db, text(
+            f"ALTER TABLE {quote}{table.name}{quote} "
+            f"ADD COLUMN {column} INTEGER DEFAULT 0 NOT NULL"
+        ))
+
+    return migration
+
+
+def _create_user_indexes(*columns: str
+                         ) -> Callable[[Database], Awaitable[None]]:
+    async def migration(db: Database) -> None:
+        for index in user_table.indexes:
+            if set(index.columns.keys()) <= set(columns):
+                await _execute_ddl(db, CreateIndex(index))
+
+    return migration
+
+
+# Version: migration, applied in order to tables created
+# before the version was introduced. Migrations are idempotent,
+# as workers starting together may apply the same migration.
+_MIGRATIONS = {
+    1: _create_user_indexes(
+        "name", "email", "email_vaildate", "password_reset_code"
+    ),
+    2: _create_user_indexes("email_confirmed", "password_reset_generated"),
+    3: _create_outbox_table,
+    4: _add_counter(user_table, "session_counter"),
+    5: _add_counter(outbox_table, "attempts")
+}
+_SCHEMA_VERSION = max(_MIGRATIONS)
+
+
 class SqlWrapper:
     """Doesn't cover SQL syntax entirely, but just
        includes needed functions.
@@ -95,23 +246,240 @@ class SqlWrapper:
         self._db = db
 
         self._tables = {
-            "user": user_table
+            "user": user_table,
+            "outbox": outbox_table
         }
 
+    def transaction(self) -> AsyncContextManager:
+        """Writes within the transaction are committed together.
+        """
+
+        return self._db.transaction()
+
+    async def __has_table(self, table: Table) -> bool:
+        dialect = self._db.url.dialect
+        if dialect == "sqlite":
+            query = ("SELECT name FROM sqlite_master "
+                     "WHERE type = 'table' AND name = :name")
+        elif dialect == "mysql":
+            query = ("SELECT table_name FROM information_schema.tables "
+                     "WHERE table_schema = DATABASE() AND table_name = :name")
+        else:
+            query = ("SELECT table_name FROM information_schema.tables "
+                     "WHERE table_schema = current_schema() "
+                     "AND table_name = :name")
+
+        return await self._db.fetch_val(
+            text(query).bindparams(name=table.name)
+        ) is not None
+
+    async def create_schema(self) -> None:
+        """Creates tables & applies pending migrations, only
+           checks the schema version if it's up to date.
+
+        Notes
+        -----
+        Safe for many workers to call at once, each applied
+        version is recorded as a row & the latest is used.
+        """
+
+        if not await self.__has_table(schema_table):
+            await _execute_ddl(self._db, CreateTable(schema_table))
+
+        version = await self._db.fetch_val(
+            select([func.max(schema_table.c.version)])
+        )
+        if version == _SCHEMA_VERSION:
+            return
+
+        if version is None:
+            if await self.__has_table(user_table):
+                version = 0
+            else:
+                # Fresh tables are created at the latest version.
+                for table in (user_table, outbox_table):
+                    await _create_table(self._db, table)
+
+                version = _SCHEMA_VERSION
+
+        # DDL isn't transactional on every database, so each
+        # migration is idempotent rather then ran within a transaction.
+        for step in range(version + 1, _SCHEMA_VERSION + 1):
+            await _MIGRATIONS[step](self._db)
+
+        try:
+            await self._db.execute(
+                schema_table.insert().values(version=_SCHEMA_VERSION)
+            )
+        except Exception as error:
+            if not _is_integrity_error(error):
+                raise
+
     def __convert_to_clauses(self, table: Table, dict_: dict) -> list:
         return [
             table.c[key] == value for key, value in dict_.items()
         ]
 
+    def __select(self, table: str, columns: Iterable[str] = None):
+        if columns is None:
+            return self._tables[table].select()
+
+        return select([self._tables[table].c[column] for column in columns])
+
+    def __where(self, table: Table, and_: dict = None,
+                in_: Dict[str, list] = None) -> list:
+        clauses = self.__convert_to_clauses(table, and_) if and_ else []
+        if in_:
+            for key, values in in_.items():
+                # NULL never equals anything, so IN can't match it.
+                clause = table.c[key].in_(
+                    [value for value in values if value is not None]
+                )
+                if None in values:
+                    clause = sql_or(clause, table.c[key].is_(None))
+
+                clauses.append(clause)
+
+        return clauses
+
+    async def count(self, table: str, and_: dict = None,
+                    in_: Dict[str, list] = None) -> int:
+        query = select([func.count()]).select_from(self._tables[table])
+
+        clauses = self.__where(self._tables[table], and_, in_)
+        if clauses:
+            query = query.where(sql_and(*clauses))
+
+        return await self._db.fetch_val(query)
+
+    async def claim_outbox(self, batch_size: int, now: datetime,
+                           lease_until: datetime) -> List[Mapping]:
+        """Claims unclaimed or expired outbox messages until
+           lease_until, safe to call from many processes.
+           Each claim counts as an attempt.
+        """
+
+        expired = sql_or(
+            outbox_table.c.claimed_until.is_(None),
+            outbox_table.c.claimed_until < now
+        )
+
+        message_ids = [
+            row["message_id"] for row in await self._db.fetch_all(
+                select([outbox_table.c.message_id]).where(
+                    expired
+                ).order_by(outbox_table.c.created).limit(batch_size)
+            )
+        ]
+        if not message_ids:
+            return []
+
+        # Only messages still unclaimed get this claim, so messages
+        # claimed by another process in between aren't returned.
+        claim = generate_id()
+        await self._db.execute(
+            outbox_table.update().where(sql_and(
+                outbox_table.c.message_id.in_(message_ids),
+                expired
+            )).values(
+                claim=claim,
+                claimed_until=lease_until,
+                attempts=outbox_table.c.attempts + 1
+            )
+        )
+
+        return await self._db.fetch_all(
+            outbox_table.select().where(outbox_table.c.claim == claim)
+        )
+
+    async def user_stats(self, reset_after: datetime) -> Dict[str, int]:
+        """Counts users, confirmed users & reset codes generated
+           after the given time, within a single query.
+        """
+
+        def counter(*clauses) -> Any:
+            query = select([func.count()]).select_from(user_table)
+            if clauses:
+                query = query.where(sql_and(*clauses))
+
+            return query.as_scalar()
+
+        row = await self._db.fetch_one(select([
+            counter().label("total"),
+            counter(
+                user_table.c.email_confirmed == true()
+            ).label("confirmed"),
+            counter(
+                user_table.c.password_reset_generated > reset_after
+            ).label("pending_resets")
+        ]))
+
+        return dict(row)
+
+    async def __execute_count(self, table: Table, query: Any) -> int:
+        """Executes a UPDATE or DELETE, returning the amount of rows
+           the driver reports as effected.
+        """
+
+        # asyncpg doesn't return the row count, so effected rows are
+        # counted within the same statement.
+        if self._db.url.dialect in ("postgresql", "postgres"):
+            changed = query.returning(
+                *table.primary_key.columns
+            ).cte("changed")
+            return await self._db.fetch_val(
+                select([func.count()]).select_from(changed)
+            )
+
+        return await self._db.execute(query)
+
+    async def delete_many(self, table: str, and_: dict = None,
+                          in_: Dict[str, list] = None) -> int:
+        """Deletes rows matching all of the given columns
+           & within the given values.
+
+        Returns
+        -------
+        int
+            Amount of rows deleted.
+        """
+
+        return await self.__execute_count(
+            self._tables[table],
+            self._tables[table].delete().where(sql_and(
+                *self.__where(self._tables[table], and_, in_)
+            ))
+        )
+
+    async def update_many(self, table: str, values: dict,
+                          and_: dict = None,
+                          in_: Dict[str, list] = None) -> int:
+        """Updates rows matching all of the given columns
+           & within the given values.
+
+        Returns
+        -------
+        int
+            Amount of rows matched, MySQL only counts rows
+            what were changed.
+        """
+
+        return await self.__execute_count(
+            self._tables[table],
+            self._tables[table].update().values(**values).where(sql_and(
+                *self.__where(self._tables[table], and_, in_)
+            ))
+        )
+
     async def exists(self, table: str,
                      or_: dict) -> bool:
         return await self._db.fetch_val(
-            select([func.count()]).select_from(
+            select([text("1")]).select_from(
                 self._tables[table]
             ).where(
                 sql_or(*self.__convert_to_clauses(self._tables[table], or_))
-            )
-        ) != 0
+            ).limit(1)
+        ) is not None
 
     async def delete(self, table: str,
                      and_: dict) -> None:
@@ -123,37 +491,177 @@ class SqlWrapper:
 
     async def update(self, table: str,
                      and_: dict, values: dict) -> None:
+        """
+        Raises
+        ------
+        DetailsExistError
+            Raised when a unique column is already used.
+        """
+
+        try:
+            await self._db.execute(
+                self._tables[table].update().values(
+                    **values
+                ).where(
+                    sql_and(*self.__convert_to_clauses(
+                        self._tables[table], and_
+                    ))
+                )
+            )
+        except Exception as error:
+            if _is_integrity_error(error):
+                raise DetailsExistError()
+            raise
+
+    async def increment(self, table: str, and_: dict,
+                        column: str) -> None:
         await self._db.execute(
-            self._tables[table].update().values(
-                **values
-            ).where(
+            self._tables[table].update().values({
+                column: self._tables[table].c[column] + 1
+            }).where(
                 sql_and(*self.__convert_to_clauses(self._tables[table], and_))
             )
         )
 
     async def insert(self, table: str,
                      values: dict) -> None:
-        await self._db.execute(
-            self._tables[table].insert().values(
-                **values
+        """
+        Raises
+        ------
+        DetailsExistError
+            Raised when a unique column is already used.
+        """
+
+        try:
+            await self._db.execute(
+                self._tables[table].insert().values(
+                    **values
+                )
+            )
+        except Exception as error:
+            if _is_integrity_error(error):
+                raise DetailsExistError()
+            raise
+
+    async def insert_many(self, table: str,
+                          values: List[dict]) -> List[int]:
+        """Inserts many rows within a single statement.
+
+        Returns
+        -------
+        List[int]
+            Indexes of rows rejected for using a taken unique column.
+        """
+
+        # Each attempt is within a savepoint when called within a
+        # transaction, as a failed statement aborts the transaction
+        # on some databases.
+        columns = set().union(*values)
+        try:
+            async with self._db.transaction():
+                await self._db.execute(
+                    self._tables[table].insert().values([
+                        {column: row.get(column) for column in columns}
+                        for row in values
+                    ])
+                )
+        except Exception as error:
+            if not _is_integrity_error(error):
+                raise
+        else:
+            return []
+
+        # Finds what rows were rejected.
+        rejected = []
+        for index, row in enumerate(values):
+            try:
+                async with self._db.transaction():
+                    await self.insert(table, row)
+            except DetailsExistError:
+                rejected.append(index)
+
+        return rejected
+
+    async def get_many(self, table: str, in_: Dict[str, list],
+                       columns: Iterable[str] = None) -> List[Mapping]:
+        """Gets rows where any of the given columns are
+           within the given values.
+        """
+
+        return await self._db.fetch_all(
+            self.__select(table, columns).where(
+                sql_or(*[
+                    self._tables[table].c[key].in_(value)
+                    for key, value in in_.items()
+                ])
             )
         )
 
-    async def get(self, table, and_: dict) -> Optional[Mapping]:
+    async def get(self, table, and_: dict,
+                  columns: Iterable[str] = None) -> Optional[Mapping]:
         return await self._db.fetch_one(
-            self._tables[table].select().where(
+            self.__select(table, columns).where(
                 sql_and(*self.__convert_to_clauses(self._tables[table], and_))
             )
         )
 
-    async def iterate(self, table: str, and_: dict = None
+    async def page(self, table: str, limit: int, after: str = None,
+                   and_: dict = None, descending: bool = False,
+                   columns: Iterable[str] = None,
+                   in_: Dict[str, list] = None) -> List[Mapping]:
+        """Gets rows ordered by user_id, starting after the given
+           user_id.
+        """
+
+        user_id = self._tables[table].c.user_id
+
+        clauses = self.__where(self._tables[table], and_, in_)
+        if after is not None:
+            clauses.append(user_id < after if descending else user_id > after)
+
+        query = self.__select(table, columns)
+        if clauses:
+            query = query.where(sql_and(*clauses))
+
+        return await self._db.fetch_all(
+            query.order_by(
+                user_id.desc() if descending else user_id.asc()
+            ).limit(limit)
+        )
+
+    async def batches(self, table: str, batch_size: int,
+                      and_: dict = None, columns: Iterable[str] = None,
+                      in_: Dict[str, list] = None
+                      ) -> AsyncGenerator[List[Mapping], None]:
+        """Gets rows in lists of batch_size, each batch is a
+           separate query continuing after the last user_id, so
+           memory stays bounded whatever the driver buffers.
+        """
+
+        if columns is not None and "user_id" not in columns:
+            columns = (*columns, "user_id")
+
+        after = None
+        while True:
+            rows = await self.page(table, batch_size, after, and_,
+                                   columns=columns, in_=in_)
+            if rows:
+                yield rows
+
+            if len(rows) < batch_size:
+                break
+
+            after = rows[-1]["user_id"]
+
+    async def iterate(self, table: str, and_: dict = None,
+                      columns: Iterable[str] = None,
+                      in_: Dict[str, list] = None
                       ) -> AsyncGenerator[Mapping, None]:
-        query = self._tables[table].select()
+        query = self.__select(table, columns)
 
-        if and_:
-            query = query.where(
-                sql_and(*self.__convert_to_clauses(self._tables[table], and_))
-            )
+        clauses = self.__where(self._tables[table], and_, in_)
+        if clauses:
+            query = query.where(sql_and(*clauses))
 
         async for row in self._db.iterate(query):
             yield row
@@ -0,0 +1,160 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import List, Optional
+
+from ._errors import LoginThrottled
+
+# Least recently used windows checked for one to forget.
+_EVICT_SCAN = 64
+
+
+class LoginThrottle:
+    # key -> [window start, attempts this window, attempts last window]
+    _windows: "OrderedDict[str, List[float]]"
+
+    def __init__(self, attempts: int = 5, key_attempts: int = 50,
+                 window: float = 60.0, max_keys: int = 100000) -> None:
+        """Limits login attempts within a sliding window, attempts
+           over the limit are rejected before the database or
+           password hasher is used.
+
+        Parameters
+        ----------
+        attempts : int, optional
+            Max attempts per account within the window,
+            by default 5
+        key_attempts : int, optional
+            Max attempts per throttle key given to 'login',
+            e.g. an IP address, by default 50
+        window : float, optional
+            Seconds attempts are counted for, by default 60.0
+        max_keys : int, optional
+            Max amount of accounts & keys tracked, by default 100000
+
+        Notes
+        -----
+        A successful login resets its account's attempts.
+
+        Once max_keys are tracked, the least recently used account
+        or key under its limit is forgotten, so spraying attempts
+        across many accounts doesn't reset throttled accounts.
+        If the least recently used are all throttled the oldest is
+        forgotten, so max_keys should be well above the accounts
+        expected to be attacked at once.
+        """
+
+        self._attempts = attempts
+        self._key_attempts = key_attempts
+        self._window = window
+        self._max_keys = max_keys
+
+        self._windows = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def __weight(self, window: List[float], now: float) -> float:
+        """Attempts within the sliding window ending now.
+        """
+
+        start, current, previous = window
+
+        passed = int((now - start) // self._window)
+        if passed > 1:
+            return 0.0
+        if passed == 1:
+            start, current, previous = start + self._window, 0, current
+
+        # Last window's attempts are weighted by how much of it
+        # still overlaps the sliding window.
+        remaining = self._window - (now - start)
+        return previous * remaining / self._window + current
+
+    def __limit(self, key: str) -> int:
+        if key.startswith("key:"):
+            return self._key_attempts
+
+        return self._attempts
+
+    def __evict(self, now: float) -> None:
+        """Forgets the least recently used window under its limit,
+           or the least recently used if none are.
+        """
+
+        for index, (key, window) in enumerate(self._windows.items()):
+            if index == _EVICT_SCAN:
+                break
+
+            if self.__weight(window, now) < self.__limit(key):
+                del self._windows[key]
+                return
+
+        self._windows.popitem(last=False)
+
+    def __current(self, key: str, now: float) -> List[float]:
+        window = self._windows.get(key)
+        if window is None:
+            if len(self._windows) >= self._max_keys:
+                self.__evict(now)
+
+            window = [now, 0, 0]
+            self._windows[key] = window
+        else:
+            self._windows.move_to_end(key)
+
+            passed = int((now - window[0]) // self._window)
+            if passed:
+                window[0] += passed * self._window
+                window[2] = window[1] if passed == 1 else 0
+                window[1] = 0
+
+        return window
+
+    def __retry_after(self, key: str, limit: int,
+                      now: float) -> Optional[float]:
+        """Records an attempt, unless over the limit.
+
+        Returns
+        -------
+        Optional[float]
+            Seconds until attempts are allowed, None if allowed.
+        """
+
+        window = self.__current(key, now)
+        start, current, previous = window
+
+        remaining = self._window - (now - start)
+        if self.__weight(window, now) < limit:
+            window[1] += 1
+            return None
+
+        if current >= limit:
+            return remaining + self._window * (1 - limit / current)
+
+        return remaining - (limit - current) * self._window / previous
+
+    def _attempt(self, account: str, key: str = None) -> None:
+        """Records a login attempt.
+
+        Raises
+        ------
+        LoginThrottled
+        """
+
+        now = monotonic()
+
+        if key is not None:
+            retry_after = self.__retry_after(
+                "key:" + key, self._key_attempts, now
+            )
+            if retry_after is not None:
+                raise LoginThrottled(retry_after)
+
+        retry_after = self.__retry_after(
+            "account:" + account, self._attempts, now
+        )
+        if retry_after is not None:
+            raise LoginThrottled(retry_after)
+
+    def _succeeded(self, account: str) -> None:
+        self._windows.pop("account:" + account, None)
@@ -1,14 +1,12 @@
-from typing import Mapping, Optional, TYPE_CHECKING
-from bcrypt import checkpw, hashpw, gensalt
-from email_validator import validate_email, EmailNotValidError
+from typing import Iterable, Mapping, Optional, TYPE_CHECKING
 from secrets import token_urlsafe
 from datetime import datetime
 
 from ._models import UserModel
+from ._const import _MODEL_COLUMNS
 from ._errors import (
     UserIdError,
     InvalidLogin,
-    EmailError,
     PasswordResetInvalid,
     DetailsExistError
 )
@@ -27,10 +25,24 @@ class User:
     def __and(self) -> dict:
         return {"user_id": self.user_id}
 
-    async def __raw_user(self) -> Optional[Mapping]:
-        return await self._upper._db_wrapper.get(
-            "user", self.__and
+    async def __raw_user(self, columns: Iterable[str] = _MODEL_COLUMNS
+                         ) -> Optional[Mapping]:
+        return await self._upper._get_user(self.__and, columns)
+
+    async def revoke_sessions(self) -> None:
+        """Revokes every session token issued to the user.
+        """
+
+        await self._upper._db_wrapper.increment(
+            "user", self.__and, "session_counter"
         )
+        self._upper._invalidate(self.user_id)
+
+    async def __password_changed(self) -> None:
+        if self._upper._sessions is not None:
+            await self.revoke_sessions()
+        else:
+            self._upper._invalidate(self.user_id)
 
     async def update_password(self, current_password: str,
                               new_password: str) -> None:
@@ -48,20 +60,22 @@ class User:
         PasswordPolicyError
         """
 
-        user = await self.__raw_user()
+        user = await self.__raw_user(("user_id", "password"))
         if not user:
             raise InvalidLogin()
 
-        if not checkpw(current_password.encode(), user["password"]):
+        if not await self._upper._check_password(current_password,
+                                                 user["password"]):
             raise InvalidLogin()
 
         self._upper._validate_details(password=new_password)
 
         await self._upper._db_wrapper.update(
             "user", self.__and, {
-                "password": hashpw(new_password.encode(), gensalt())
+                "password": await self._upper._hash_password(new_password)
             }
         )
+        await self.__password_changed()
 
     async def update_name(self, name: str) -> None:
         """Updates users name
@@ -79,13 +93,16 @@ class User:
 
         self._upper._validate_details(name=name)
 
-        if await self._upper._db_wrapper.exists(
-                "user", {"name": name}):
+        if (self._upper._maybe_taken("name", name) and
+                await self._upper._db_wrapper.exists(
+                    "user", {"name": name})):
             raise DetailsExistError()
 
         await self._upper._db_wrapper.update(
             "user", self.__and, {"name": name}
         )
+        self._upper._mark_taken(name=name)
+        self._upper._invalidate(self.user_id)
 
     async def update_email(self, new_email: str) -> None:
         """Used to update a user's email.
@@ -100,36 +117,34 @@ class User:
         DetailsExistError
         """
 
-        try:
-            valid = validate_email(new_email)
-        except EmailNotValidError as error:
-            raise EmailError(str(error))
+        email = await self._upper._email_validator.validate(new_email)
 
-        if await self._upper._db_wrapper.exists(
-                "user", {"email": valid.email}):
+        if (self._upper._maybe_taken("email", email) and
+                await self._upper._db_wrapper.exists(
+                    "user", {"email": email})):
             raise DetailsExistError()
 
         values = {
-            "email": valid.email,
+            "email": email,
         }
 
+        code = None
         if self._upper._smtp:
+            code, regenerated = self._upper._email_regenerate()
             values = {
                 **values,
-                **self._upper._email_regenerate()
+                **regenerated
             }
 
-            await self._upper._jobs.spawn(
-                self._upper._smtp._send(
-                    values["email"],
-                    values["email_vaildate"],
-                    "confirm"
-                )
-            )
-
-        await self._upper._db_wrapper.update(
-            "user", self.__and, values
+        # Email is only sent once the new email is stored.
+        await self._upper._write_with_email(
+            self._upper._db_wrapper.update("user", self.__and, values),
+            values["email"],
+            code,
+            "confirm"
         )
+        self._upper._invalidate(self.user_id)
+        self._upper._mark_taken(email=values["email"])
 
     async def reset_password(self) -> str:
         """Used to reset a password
@@ -143,25 +158,21 @@ class User:
 
         user = await self.get()
 
+        code = token_urlsafe(32)
         values = {
-            "password_reset_code": token_urlsafe(32),
+            "password_reset_code": self._upper._code_digest(code),
             "password_reset_generated": datetime.now()
         }
 
-        await self._upper._db_wrapper.update(
-            "user", self.__and, values
+        await self._upper._write_with_email(
+            self._upper._db_wrapper.update("user", self.__and, values),
+            user.email,
+            code,
+            "reset"
         )
+        self._upper._invalidate(self.user_id)
 
-        if self._upper._smtp and user.email:
-            await self._upper._jobs.spawn(
-                self._upper._smtp._send(
-                    user.email,
-                    values["password_reset_code"],
-                    "reset"
-                )
-            )
-
-        return values["password_reset_code"]
+        return code
 
     async def password_confirm(self, new_password: str,
                                given_code: str) -> None:
@@ -178,35 +189,27 @@ class User:
         PasswordPolicyError
         """
 
-        result = await self.__raw_user()
-        if (not result or "password_reset_code" not in result or
-                not result["password_reset_code"]):
+        result = await self._upper._db_wrapper.get("user", {
+            **self.__and,
+            "password_reset_code": self._upper._code_digest(given_code)
+        }, ("user_id", "password_reset_generated"))
+        if not result:
             raise PasswordResetInvalid()
 
         if (datetime.now() - self._upper._password_reset_expires >
                 result["password_reset_generated"]):
             raise PasswordResetInvalid()
 
-        # Midigates timing attacks.
-        valid = checkpw(
-            given_code.encode(), hashpw(
-                result["password_reset_code"].encode(),
-                gensalt()
-            )
-        )
-
-        if not valid:
-            raise PasswordResetInvalid()
-
         self._upper._validate_details(password=new_password)
 
         await self._upper._db_wrapper.update(
             "user", self.__and, {
-                "password": hashpw(new_password.encode(), gensalt()),
+                "password": await self._upper._hash_password(new_password),
                 "password_reset_code": None,
                 "password_reset_generated": None
             }
         )
+        await self.__password_changed()
 
     async def get(self) -> UserModel:
         """Used to get details on user.
@@ -224,10 +227,11 @@ class User:
         if not result:
             raise UserIdError()
 
-        return UserModel(**result)
+        return UserModel.from_row(result)
 
     async def delete(self) -> None:
         """Used to delete account, this can't be undone.
         """
 
         await self._upper._db_wrapper.delete("user", self.__and)
+        self._upper._invalidate(self.user_id)
@@ -1,5 +1,46 @@
+import hmac
+
 from uuid import uuid4
+from hashlib import sha256
+from base64 import urlsafe_b64encode
+from typing import Mapping, Set
 
 
 def generate_id() -> str:
     return str(uuid4()).replace("-", "")
+
+
+def code_digest(code: str, key: bytes) -> str:
+    """Keyed digest of a confirmation or reset code, codes are
+       high-entropy so a single HMAC round is enough.
+
+    Parameters
+    ----------
+    code : str
+    key : bytes
+
+    Returns
+    -------
+    str
+        43 characters, the same length as secrets.token_urlsafe(32).
+    """
+
+    return urlsafe_b64encode(
+        hmac.new(key, code.encode(), sha256).digest()
+    ).decode().rstrip("=")
+
+
+def detail_key(key: str, value: str) -> str:
+    """Key a name or email is compared by, case folded as some
+       databases compare case insensitively. Emails are expected
+       to already be normalized by the email validator.
+    """
+
+    return f"{key}:{value.lower()}"
+
+
+def detail_keys(values: Mapping) -> Set[str]:
+    return {
+        detail_key(key, values[key]) for key in ("name", "email")
+        if values.get(key)
+    }
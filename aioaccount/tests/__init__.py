@@ -1,33 +1,95 @@
-from .test_create_account import TestCreateAccount, TestCreateAccountSqlSmtp
+from .test_create_account import (
+    TestCreateAccount,
+    TestCreateAccountSqlSmtp,
+    TestCreateAccountSqlOutbox,
+    TestCreateAccountNoDeliverability
+)
 from .test_to_user import TestToUser, TestToUserSqlSmtp
 from .test_confirm_email import TestEmailConfirm, TestEmailConfirmMongo
-from .test_login import TestLogin, TestLoginSqlSmtp
+from .test_login import (
+    TestLogin,
+    TestLoginSqlSmtp,
+    TestLoginHashExecutor,
+    TestLoginScrypt,
+    TestLoginRehash,
+    TestLoginRehashMongo,
+    TestLoginThrottle
+)
 from .test_update_password import TestUpdatePassword, TestUpdatePasswordSqlSmtp
 from .test_update_email import TestUpdateEmail, TestUpdateEmailMongo
-from .test_get_user import TestGetUser, TestGetUserMongo
+from .test_get_user import (
+    TestGetUser,
+    TestGetUserMongo,
+    TestGetUserCached,
+    TestGetUserCachedMongo
+)
 from .test_password_resets import TestPasswordResets, TestPasswordResetsMongo
-from .test_users import TestUsers, TestUsersMongo
+from .test_users import TestUsers, TestUsersMongo, TestUsersSqlSmtp
 from .test_delete_account import TestDeleteAccount, TestDeleteAccountMongo
+from .test_create_accounts import (
+    TestCreateAccounts,
+    TestCreateAccountsMongo
+)
+from .test_update_users import TestUpdateUsers, TestUpdateUsersMongo
+from .test_available import (
+    TestAvailable,
+    TestAvailableFilter,
+    TestAvailableFilterMongo
+)
+from .test_breached_passwords import (
+    TestBreachedPasswords,
+    TestBreachedPasswordsMongo
+)
+from .test_sessions import TestSessions, TestSessionsMongo
+from .test_memory import TestMemory
+from .test_smtp import TestSmtp
+from .test_schema import TestSchema, TestIndexes, TestIndexesMongo
 
 __all__ = [
     "TestCreateAccount",
     "TestCreateAccountSqlSmtp",
+    "TestCreateAccountSqlOutbox",
+    "TestCreateAccountNoDeliverability",
     "TestToUser",
     "TestToUserSqlSmtp",
     "TestEmailConfirm",
     "TestEmailConfirmMongo",
     "TestLogin",
     "TestLoginSqlSmtp",
+    "TestLoginHashExecutor",
+    "TestLoginScrypt",
+    "TestLoginRehash",
+    "TestLoginRehashMongo",
+    "TestLoginThrottle",
     "TestUpdatePassword",
     "TestUpdatePasswordSqlSmtp",
     "TestUpdateEmail",
     "TestUpdateEmailMongo",
     "TestGetUser",
     "TestGetUserMongo",
+    "TestGetUserCached",
+    "TestGetUserCachedMongo",
     "TestPasswordResets",
     "TestPasswordResetsMongo",
     "TestUsers",
     "TestUsersMongo",
+    "TestUsersSqlSmtp",
     "TestDeleteAccount",
-    "TestDeleteAccountMongo"
+    "TestDeleteAccountMongo",
+    "TestAvailable",
+    "TestAvailableFilter",
+    "TestAvailableFilterMongo",
+    "TestCreateAccounts",
+    "TestCreateAccountsMongo",
+    "TestUpdateUsers",
+    "TestUpdateUsersMongo",
+    "TestBreachedPasswords",
+    "TestBreachedPasswordsMongo",
+    "TestSessions",
+    "TestSessionsMongo",
+    "TestMemory",
+    "TestSmtp",
+    "TestSchema",
+    "TestIndexes",
+    "TestIndexesMongo"
 ]
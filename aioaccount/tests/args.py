@@ -15,6 +15,9 @@ cli.add_argument("--smtp_email", type=str, default="")
 cli.add_argument("--mongo_server", type=str, default="localhost")
 cli.add_argument("--mongo_port", type=int, default=27017)
 
+cli.add_argument("--memory", action="store_true",
+                 help="Runs every test against the memory engine.")
+
 args = vars(cli.parse_args())
 
 MONGO_SETTINGS = {
@@ -22,6 +25,8 @@ MONGO_SETTINGS = {
     "port": args["mongo_port"]
 }
 
+USE_MEMORY = args["memory"]
+
 SQL_CONNECTION = "mysql://{}:{}@{}:{}/{}?charset=utf8mb4".format(
     args["sql_username"],
     args["sql_password"],
@@ -1,37 +1,61 @@
 import asynctest
 
+from typing import Union
+
 from .. import (
     AccountHandler,
     MongoEngine,
     SQLEngine,
+    MemoryEngine,
     Database,
-    SmtpClient
+    SmtpClient,
+    BcryptHasher
 )
 
-from .args import MONGO_SETTINGS, SQL_CONNECTION, SMTP_SETTINGS
+from .args import (
+    MONGO_SETTINGS,
+    SQL_CONNECTION,
+    SMTP_SETTINGS,
+    USE_MEMORY
+)
 
 
 class TestBase(asynctest.TestCase):
     use_default_loop = True
     use_sql = False
     use_smtp = False
+    use_memory = False
+    handler_kwargs: dict = {}
 
     handler: AccountHandler
 
+    def engine(self) -> Union[MemoryEngine, SQLEngine, MongoEngine]:
+        if self.use_memory or USE_MEMORY:
+            return MemoryEngine()
+        elif self.use_sql:
+            return SQLEngine(Database(SQL_CONNECTION))
+        else:
+            return MongoEngine(**MONGO_SETTINGS)
+
     async def setUp(self) -> None:
-        engine = MongoEngine(
-            **MONGO_SETTINGS
-        ) if not self.use_sql else SQLEngine(
-            Database(SQL_CONNECTION)
-        )
         self.handler = AccountHandler(
-            engine=engine,
+            engine=self.engine(),
             smtp=SmtpClient(
                 **SMTP_SETTINGS
-            ) if self.use_smtp else None
+            ) if self.use_smtp else None,
+            **{
+                # Cheapest bcrypt cost, keeps tests fast.
+                "hasher": BcryptHasher(rounds=4),
+                **self.handler_kwargs
+            }
         )
 
         await self.handler.start()
 
     async def tearDown(self) -> None:
+        # Test classes share a database & reuse names, so each
+        # test removes the rows it created.
+        for table in ("user", "outbox"):
+            await self.handler._db_wrapper.delete_many(table)
+
         await self.handler.close()
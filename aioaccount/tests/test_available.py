@@ -0,0 +1,38 @@
+from .base import TestBase
+from .. import AccountDetailsError, BloomFilter
+
+
+class TestAvailable(TestBase):
+    use_sql = True
+
+    valid_password = "#!K2&33?e%@Pv3_Q"
+
+    async def test_no_name_or_email(self) -> None:
+        with self.assertRaises(AccountDetailsError):
+            await self.handler.available()
+
+    async def test_available(self) -> None:
+        self.assertTrue(
+            await self.handler.available(name="neverusedname")
+        )
+
+    async def test_taken(self) -> None:
+        model, _ = await self.handler.create_account(
+            password=self.valid_password,
+            name="takenname",
+            email="takenname@example.com"
+        )
+
+        self.assertFalse(await self.handler.available(name=model.name))
+        self.assertFalse(await self.handler.available(email=model.email))
+
+
+class TestAvailableFilter(TestAvailable):
+    use_sql = True
+    handler_kwargs = {
+        "taken_filter": BloomFilter(capacity=1000, error_rate=0.01)
+    }
+
+
+class TestAvailableFilterMongo(TestAvailableFilter):
+    use_sql = False
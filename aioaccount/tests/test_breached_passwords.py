@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+from hashlib import sha1
+
+from .base import TestBase
+from .. import (
+    PasswordPolicy,
+    BreachedPasswords,
+    PasswordBreachedError,
+    PasswordPolicyError,
+    build_breach_file
+)
+
+
+class TestBreachedPasswords(TestBase):
+    use_sql = True
+
+    breached_password = "#!K2&33?e%@Pv3_Q"
+    valid_password = "#!K2&33?e%@Pv3_R"
+
+    async def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+        source = os.path.join(self.directory.name, "hashes.txt")
+        with open(source, "w") as file:
+            file.write(
+                sha1(self.breached_password.encode()).hexdigest().upper() +
+                ":10\n"
+            )
+
+        output = os.path.join(self.directory.name, "breached.bin")
+        build_breach_file(source, output)
+
+        self.breached = BreachedPasswords(output)
+        self.handler_kwargs = {
+            "password_policy": PasswordPolicy(breached=self.breached)
+        }
+
+        await super().setUp()
+
+    async def tearDown(self) -> None:
+        await super().tearDown()
+
+        self.breached.close()
+        self.directory.cleanup()
+
+    async def test_breached_rejected(self) -> None:
+        with self.assertRaises(PasswordBreachedError):
+            await self.handler.create_account(
+                password=self.breached_password,
+                name="breached"
+            )
+
+        self.assertTrue(
+            issubclass(PasswordBreachedError, PasswordPolicyError)
+        )
+
+    async def test_not_breached(self) -> None:
+        self.assertNotIn(self.valid_password, self.breached)
+
+        await self.handler.create_account(
+            password=self.valid_password,
+            name="notbreached"
+        )
+
+    async def test_malformed_line(self) -> None:
+        source = os.path.join(self.directory.name, "malformed.txt")
+        with open(source, "w") as file:
+            file.write(
+                sha1(self.breached_password.encode()).hexdigest() +
+                ":10\nABCD:3\n"
+            )
+
+        output = os.path.join(self.directory.name, "malformed.bin")
+        with self.assertRaises(ValueError):
+            build_breach_file(source, output)
+
+        self.assertFalse(os.path.exists(output))
+
+
+class TestBreachedPasswordsMongo(TestBreachedPasswords):
+    use_sql = False
@@ -40,9 +40,18 @@ class TestEmailConfirm(TestBase):
         if not result:
             raise Exception("this shouldn't happen")
 
+        # Only the code's digest is stored.
+        code = "somecodewhatwasemailed"
+        self.assertNotEqual(result["email_vaildate"], code)
+
+        await self.handler._db_wrapper.update(
+            "user", {"user_id": model.user_id},
+            {"email_vaildate": self.handler._code_digest(code)}
+        )
+
         user = await self.handler.confirm_email(
             email=cast(str, model.email),
-            given_code=result["email_vaildate"]
+            given_code=code
         )
 
         self.assertIsInstance(user, User)
@@ -1,3 +1,5 @@
+import asyncio
+
 from .base import TestBase
 from .. import (
     PasswordPolicyError,
@@ -8,7 +10,9 @@ from .. import (
     _MAX_NAME_LEN,
     UserModel,
     User,
-    DetailsExistError
+    DetailsExistError,
+    Outbox,
+    EmailValidator
 )
 
 
@@ -109,7 +113,77 @@ class TestCreateAccount(TestBase):
                 email=model.email
             )
 
+    async def test_account_name_taken_concurrently(self) -> None:
+        results = await asyncio.gather(*[
+            self.handler.create_account(
+                password=self.valid_password,
+                name="racingname"
+            ) for _ in range(2)
+        ], return_exceptions=True)
+
+        self.assertEqual(
+            len([
+                result for result in results
+                if isinstance(result, DetailsExistError)
+            ]),
+            1
+        )
+
 
 class TestCreateAccountSqlSmtp(TestCreateAccount):
     use_sql = True
     use_smtp = True
+
+
+class TestCreateAccountSqlOutbox(TestCreateAccountSqlSmtp):
+    handler_kwargs = {
+        "outbox": Outbox(interval=0.1)
+    }
+
+    async def test_outbox_drained(self) -> None:
+        await self.handler.create_account(
+            password=self.valid_password,
+            email="outbox@example.com"
+        )
+
+        for _ in range(50):
+            if not await self.handler._db_wrapper.count("outbox"):
+                break
+
+            await asyncio.sleep(0.1)
+
+        self.assertEqual(await self.handler._db_wrapper.count("outbox"), 0)
+
+    async def test_outbox_max_attempts(self) -> None:
+        class FailingSmtp:
+            async def _enqueue(self, email, code, type_, sent) -> None:
+                sent.set_result(False)
+
+        # Stops the worker so it doesn't claim the email.
+        await self.handler._outbox.close()
+
+        outbox = Outbox(lease=0.0, max_attempts=2)
+        await self.handler._db_wrapper.insert(
+            "outbox", outbox._message("failing@example.com", "code", "confirm")
+        )
+
+        loop = asyncio.get_event_loop()
+        reported = []
+        loop.set_exception_handler(lambda _, context: reported.append(context))
+        try:
+            for _ in range(2):
+                await asyncio.sleep(0.01)
+                self.assertEqual(await outbox._drain(
+                    self.handler._db_wrapper, FailingSmtp()
+                ), 1)
+        finally:
+            loop.set_exception_handler(None)
+
+        self.assertEqual(await self.handler._db_wrapper.count("outbox"), 0)
+        self.assertEqual(len(reported), 1)
+
+
+class TestCreateAccountNoDeliverability(TestCreateAccount):
+    handler_kwargs = {
+        "email_validator": EmailValidator(check_deliverability=False)
+    }
@@ -0,0 +1,104 @@
+from .base import TestBase
+from .. import (
+    DetailsExistError,
+    NameLengthInvalidError,
+    AccountDetailsError
+)
+
+
+class TestCreateAccounts(TestBase):
+    use_sql = True
+    use_smtp = False
+
+    valid_password = "#!K2&33?e%@Pv3_Q"
+
+    async def test_create_accounts(self) -> None:
+        await self.handler.create_account(
+            password=self.valid_password,
+            name="bulktaken"
+        )
+
+        results = [
+            result async for result in self.handler.create_accounts([
+                {"name": "bulkone", "password": self.valid_password},
+                {"name": "bulkone", "password": self.valid_password},
+                {"name": "bulktaken", "password": self.valid_password},
+                {"name": "bu", "password": self.valid_password},
+                {"email": "bulktwo@example.com",
+                 "password": self.valid_password}
+            ], batch_size=2)
+        ]
+
+        self.assertEqual([result.index for result in results],
+                         list(range(5)))
+
+        self.assertTrue(results[0].created)
+        self.assertIsInstance(results[1].error, DetailsExistError)
+        self.assertIsInstance(results[2].error, DetailsExistError)
+        self.assertIsInstance(results[3].error, NameLengthInvalidError)
+        self.assertTrue(results[4].created)
+
+        await self.handler.login(
+            password=self.valid_password,
+            name="bulkone"
+        )
+
+    async def test_create_accounts_case(self) -> None:
+        results = [
+            result async for result in self.handler.create_accounts([
+                {"email": "BulkCase@example.com",
+                 "password": self.valid_password},
+                {"email": "bulkcase@EXAMPLE.com",
+                 "password": self.valid_password}
+            ])
+        ]
+
+        # Compared within a batch as the taken filter compares them.
+        self.assertTrue(results[0].created)
+        self.assertIsInstance(results[1].error, DetailsExistError)
+
+    async def test_create_accounts_malformed(self) -> None:
+        results = [
+            result async for result in self.handler.create_accounts([
+                {"name": "bulkmalformedone", "password": self.valid_password},
+                {"name": "bulkmalformednone", "password": None},
+                {"name": "bulkmalformedempty", "password": ""},
+                {"name": "bulkmalformedmissing"},
+                {"name": 1234, "password": self.valid_password},
+                {"name": "bulkmalformedtwo", "password": self.valid_password}
+            ], batch_size=2)
+        ]
+
+        self.assertTrue(results[0].created)
+        for result in results[1:5]:
+            self.assertIsInstance(result.error, AccountDetailsError)
+        self.assertTrue(results[5].created)
+
+        results = [
+            result async for result in self.handler.create_accounts([
+                {"name": "bulkmalformedhash"}
+            ], prehashed=True)
+        ]
+        self.assertIsInstance(results[0].error, AccountDetailsError)
+
+    async def test_create_accounts_prehashed(self) -> None:
+        hashed = await self.handler._hash_password(self.valid_password)
+
+        results = [
+            result async for result in self.handler.create_accounts([
+                {"name": "bulkhashed", "password": hashed},
+                {"name": "bulkunknown", "password": b"notahash"}
+            ], prehashed=True)
+        ]
+
+        self.assertTrue(results[0].created)
+        self.assertIsInstance(results[1].error, AccountDetailsError)
+
+        await self.handler.login(
+            password=self.valid_password,
+            name="bulkhashed"
+        )
+
+
+class TestCreateAccountsMongo(TestCreateAccounts):
+    use_sql = False
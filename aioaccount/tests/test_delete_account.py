@@ -1,5 +1,5 @@
 from .base import TestBase
-from .. import UserIdError
+from .. import UserIdError, AccountDetailsError
 
 
 class TestDeleteAccount(TestBase):
@@ -18,6 +18,32 @@ class TestDeleteAccount(TestBase):
         with self.assertRaises(UserIdError):
             await user.get()
 
+    async def test_delete_users(self) -> None:
+        users = []
+        for name in ("bulkdelone", "bulkdeltwo", "bulkdelthree"):
+            _, user = await self.handler.create_account(
+                password=self.valid_password,
+                name=name
+            )
+            users.append(user)
+
+        self.assertEqual(
+            await self.handler.delete_users(
+                [user.user_id for user in users[:2]],
+                chunk_size=1
+            ),
+            2
+        )
+
+        with self.assertRaises(UserIdError):
+            await users[0].get()
+
+        await users[2].get()
+
+    async def test_delete_users_nothing_given(self) -> None:
+        with self.assertRaises(AccountDetailsError):
+            await self.handler.delete_users()
+
 
 class TestDeleteAccountMongo(TestDeleteAccount):
     use_sql = False
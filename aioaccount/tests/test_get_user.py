@@ -1,5 +1,9 @@
+from dataclasses import is_dataclass
+from unittest import mock
+
 from .base import TestBase
-from .. import UserModel, UserIdError
+from .. import UserModel, UserIdError, UserCache
+from .._const import _MODEL_COLUMNS, _LOGIN_COLUMNS
 
 
 class TestGetUser(TestBase):
@@ -22,6 +26,76 @@ class TestGetUser(TestBase):
             UserModel
         )
 
+    async def test_get_matches_created(self) -> None:
+        model, user = await self.handler.create_account(
+            password=self.valid_password,
+            name="matchname"
+        )
+
+        fetched = await user.get()
+        self.assertEqual(fetched, model)
+        self.assertFalse(hasattr(fetched, "password"))
+
+        # Still a dataclass, though slotted.
+        self.assertTrue(is_dataclass(fetched))
+        self.assertFalse(hasattr(fetched, "__dict__"))
+        self.assertIn("name='matchname'", repr(fetched))
+
 
 class TestGetUserMongo(TestGetUser):
     use_sql = False
+
+
+class TestGetUserCached(TestGetUser):
+    use_sql = True
+    handler_kwargs = {
+        "cache": UserCache(max_size=8, ttl=60.0)
+    }
+
+    async def test_cached_get(self) -> None:
+        _, user = await self.handler.create_account(
+            password=self.valid_password,
+            name="cachedname"
+        )
+
+        cache = self.handler._cache
+        if cache is None:
+            raise Exception("Shouldn't happen")
+
+        await user.get()
+        hits = cache.hits
+        await user.get()
+        self.assertEqual(cache.hits, hits + 1)
+
+        await user.update_name("cachedrename")
+        self.assertEqual((await user.get()).name, "cachedrename")
+
+    async def test_cached_columns(self) -> None:
+        _, user = await self.handler.create_account(
+            password=self.valid_password,
+            name="cachedcolumns"
+        )
+
+        cache = self.handler._cache
+        if cache is None:
+            raise Exception("Shouldn't happen")
+
+        with mock.patch.object(
+                self.handler._db_wrapper, "get",
+                wraps=self.handler._db_wrapper.get) as get:
+            await user.get()
+            self.assertEqual(tuple(get.call_args[0][2]), _MODEL_COLUMNS)
+
+            # Logins always fetch the hash, it's never cached.
+            await self.handler.login(
+                self.valid_password, name="cachedcolumns"
+            )
+            self.assertEqual(tuple(get.call_args[0][2]), _LOGIN_COLUMNS)
+            self.assertEqual(get.call_count, 2)
+
+        _, row = cache._users[user.user_id]
+        self.assertEqual(set(row), set(_MODEL_COLUMNS))
+
+
+class TestGetUserCachedMongo(TestGetUserCached):
+    use_sql = False
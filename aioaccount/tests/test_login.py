@@ -1,5 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from .base import TestBase
-from .. import AccountDetailsError, InvalidLogin
+from .. import (
+    AccountDetailsError,
+    InvalidLogin,
+    BcryptHasher,
+    ScryptHasher,
+    LoginThrottle,
+    LoginThrottled
+)
 
 
 class TestLogin(TestBase):
@@ -128,3 +137,134 @@ class TestLogin(TestBase):
 class TestLoginSqlSmtp(TestLogin):
     use_sql = True
     use_smtp = True
+
+
+class TestLoginHashExecutor(TestLogin):
+    use_sql = True
+    use_smtp = False
+    handler_kwargs = {
+        "hash_executor": ThreadPoolExecutor(max_workers=2),
+        "max_concurrent_hashes": 2
+    }
+
+
+class TestLoginScrypt(TestLogin):
+    use_sql = False
+    use_smtp = False
+    handler_kwargs = {
+        "hasher": ScryptHasher(n_log2=10)
+    }
+
+
+class TestLoginRehash(TestBase):
+    use_sql = True
+    use_smtp = False
+
+    valid_password = "S]Q}67=uLetG{r,_8{"
+
+    async def test_rehash_on_login(self) -> None:
+        model, _ = await self.handler.create_account(
+            password=self.valid_password,
+            name="rehashme"
+        )
+
+        self.handler._hasher = BcryptHasher(rounds=5)
+
+        await self.handler.login(
+            password=self.valid_password,
+            name=model.name
+        )
+
+        result = await self.handler._db_wrapper.get(
+            "user", {"user_id": model.user_id}
+        )
+        if not result:
+            raise Exception("Shouldn't happen")
+
+        self.assertFalse(self.handler._needs_rehash(result["password"]))
+
+        await self.handler.login(
+            password=self.valid_password,
+            name=model.name
+        )
+
+
+class TestLoginRehashMongo(TestLoginRehash):
+    use_sql = False
+
+
+class TestLoginThrottle(TestBase):
+    use_sql = True
+    use_smtp = False
+    handler_kwargs = {
+        "login_throttle": LoginThrottle(attempts=3, key_attempts=4)
+    }
+
+    valid_password = "S]Q}67=uLetG{r,_8{"
+
+    async def test_account_throttled(self) -> None:
+        await self.handler.create_account(
+            password=self.valid_password,
+            name="throttleme"
+        )
+
+        for _ in range(3):
+            with self.assertRaises(InvalidLogin):
+                await self.handler.login(password="12341", name="throttleme")
+
+        with self.assertRaises(LoginThrottled) as context:
+            await self.handler.login(
+                password=self.valid_password,
+                name="throttleme"
+            )
+
+        self.assertGreater(context.exception.retry_after, 0)
+
+    async def test_key_throttled(self) -> None:
+        for index in range(4):
+            with self.assertRaises(InvalidLogin):
+                await self.handler.login(
+                    password="12341",
+                    name=f"throttlekey{index}",
+                    throttle_key="127.0.0.1"
+                )
+
+        with self.assertRaises(LoginThrottled):
+            await self.handler.login(
+                password="12341",
+                name="throttlekeyother",
+                throttle_key="127.0.0.1"
+            )
+
+    async def test_spraying_keeps_throttled(self) -> None:
+        throttle = LoginThrottle(attempts=3, max_keys=10)
+
+        for _ in range(3):
+            throttle._attempt("victim")
+
+        # Spraying other accounts forgets them rather then the victim.
+        for index in range(50):
+            throttle._attempt(f"sprayed{index}")
+
+        self.assertEqual(len(throttle), 10)
+        with self.assertRaises(LoginThrottled):
+            throttle._attempt("victim")
+
+    async def test_success_resets(self) -> None:
+        await self.handler.create_account(
+            password=self.valid_password,
+            name="throttlereset"
+        )
+
+        for _ in range(2):
+            with self.assertRaises(InvalidLogin):
+                await self.handler.login(
+                    password="12341",
+                    name="throttlereset"
+                )
+
+        for _ in range(3):
+            await self.handler.login(
+                password=self.valid_password,
+                name="throttlereset"
+            )
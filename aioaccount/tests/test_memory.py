@@ -0,0 +1,106 @@
+import os
+import tempfile
+
+from .base import TestBase
+from .. import (
+    AccountHandler,
+    MemoryEngine,
+    BcryptHasher,
+    DetailsExistError
+)
+
+
+class TestMemory(TestBase):
+    use_memory = True
+
+    valid_password = "S]Q}67=uLetG{r,_8{"
+
+    async def test_unique(self) -> None:
+        await self.handler.create_account(
+            password=self.valid_password,
+            name="memoryunique",
+            email="memoryunique@example.com"
+        )
+
+        with self.assertRaises(DetailsExistError):
+            await self.handler.create_account(
+                password=self.valid_password,
+                name="memoryunique"
+            )
+
+        with self.assertRaises(DetailsExistError):
+            await self.handler.create_account(
+                password=self.valid_password,
+                email="memoryunique@example.com"
+            )
+
+    async def test_transaction_rollback(self) -> None:
+        model, _ = await self.handler.create_account(
+            password=self.valid_password,
+            name="memoryrollback"
+        )
+
+        with self.assertRaises(DetailsExistError):
+            async with self.handler._db_wrapper.transaction():
+                await self.handler._db_wrapper.update(
+                    "user", {"user_id": model.user_id},
+                    {"name": "memoryrolledback"}
+                )
+                await self.handler._db_wrapper.insert(
+                    "user", {"user_id": model.user_id}
+                )
+
+        self.assertEqual(
+            (await self.handler.user(model.user_id).get()).name,
+            "memoryrollback"
+        )
+        self.assertTrue(
+            await self.handler.available(name="memoryrolledback")
+        )
+
+    async def test_ordered(self) -> None:
+        wrapper = self.handler._db_wrapper
+        table = wrapper._tables["user"]
+
+        for user_id in ("memoryorder3", "memoryorder1", "memoryorder2"):
+            await wrapper.insert("user", {"user_id": user_id})
+        await wrapper.delete("user", {"user_id": "memoryorder1"})
+
+        with self.assertRaises(DetailsExistError):
+            async with wrapper.transaction():
+                await wrapper.delete("user", {"user_id": "memoryorder2"})
+                await wrapper.insert("user", {"user_id": "memoryorder0"})
+                await wrapper.insert("user", {"user_id": "memoryorder3"})
+
+        self.assertEqual(table.ordered(), sorted(table.rows))
+        self.assertEqual(
+            [row["user_id"] for row in await wrapper.page("user", 10)],
+            ["memoryorder2", "memoryorder3"]
+        )
+
+    async def test_snapshot(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot = os.path.join(directory, "accounts.pickle")
+
+            handler = AccountHandler(
+                MemoryEngine(snapshot), hasher=BcryptHasher(rounds=4)
+            )
+            await handler.start()
+            model, _ = await handler.create_account(
+                password=self.valid_password,
+                name="memorysnapshot"
+            )
+            await handler.close()
+
+            handler = AccountHandler(
+                MemoryEngine(snapshot), hasher=BcryptHasher(rounds=4)
+            )
+            await handler.start()
+            try:
+                login_model, _ = await handler.login(
+                    password=self.valid_password,
+                    name="memorysnapshot"
+                )
+                self.assertEqual(login_model, model)
+            finally:
+                await handler.close()
@@ -0,0 +1,159 @@
+import asyncio
+
+from sqlalchemy import (
+    MetaData,
+    Table,
+    Column,
+    Binary,
+    String,
+    Boolean,
+    func,
+    select,
+    TIMESTAMP
+)
+from sqlalchemy.schema import CreateTable, DropTable
+
+from .base import TestBase
+from .args import USE_MEMORY
+from .. import AccountHandler, DetailsExistError, _MAX_NAME_LEN
+from .._util import generate_id
+from .._sql import (
+    user_table,
+    outbox_table,
+    schema_table,
+    _MIGRATIONS,
+    _SCHEMA_VERSION
+)
+
+# User table as it was before schema versions.
+baseline_user_table = Table(
+    "user",
+    MetaData(),
+    Column("user_id", String(length=32), primary_key=True),
+    Column("name", String(length=_MAX_NAME_LEN), nullable=True),
+    Column("email", String(length=255), nullable=True),
+    Column("email_vaildate", String(length=43), nullable=True),
+    Column("password_reset_code", String(length=43), nullable=True),
+    Column("password_reset_generated", TIMESTAMP, nullable=True),
+    Column("email_confirmed", Boolean(), nullable=True),
+    Column("password", Binary()),
+    mysql_engine="InnoDB",
+    mysql_charset="utf8mb4"
+)
+
+
+class TestSchema(TestBase):
+    use_sql = True
+
+    async def setUp(self) -> None:
+        if USE_MEMORY:
+            self.skipTest("Schemas are only versioned for SQL.")
+
+        await super().setUp()
+
+        self.db = self.handler._db
+
+        # Tables are put back to how they were before schema versions.
+        for table in (schema_table, outbox_table, user_table):
+            await self.db.execute(DropTable(table))
+        await self.db.execute(CreateTable(baseline_user_table))
+
+        await self.db.execute(baseline_user_table.insert().values(
+            user_id="baselineuser",
+            name="baselineuser",
+            email="baselineuser@example.com",
+            email_confirmed=True
+        ))
+
+    async def versions(self) -> list:
+        return [
+            row["version"] for row in await self.db.fetch_all(
+                schema_table.select()
+            )
+        ]
+
+    async def test_migrate_from_baseline(self) -> None:
+        await self.handler._db_wrapper.create_schema()
+
+        self.assertEqual(max(await self.versions()), _SCHEMA_VERSION)
+
+        # Existing users are kept & given new columns' defaults.
+        row = await self.db.fetch_one(
+            user_table.select().where(user_table.c.user_id == "baselineuser")
+        )
+        self.assertEqual(row["name"], "baselineuser")
+        self.assertEqual(row["session_counter"], 0)
+
+        self.assertEqual(await self.handler._db_wrapper.count("outbox"), 0)
+
+        # Unique indexes are added by migrations.
+        with self.assertRaises(DetailsExistError):
+            await self.handler._db_wrapper.insert("user", {
+                "user_id": "baselineother",
+                "name": "baselineuser"
+            })
+
+    async def test_create_schema_twice(self) -> None:
+        for _ in range(2):
+            await self.handler._db_wrapper.create_schema()
+
+        self.assertEqual(await self.versions(), [_SCHEMA_VERSION])
+
+        # Migrations are idempotent, as workers starting together
+        # may apply the same migration.
+        for migration in _MIGRATIONS.values():
+            await migration(self.db)
+
+        self.assertEqual(
+            await self.db.fetch_val(
+                select([func.count()]).select_from(user_table)
+            ),
+            1
+        )
+
+
+class TestIndexes(TestBase):
+    use_sql = True
+
+    async def test_unique(self) -> None:
+        for key in ("name", "email"):
+            await self.handler._db_wrapper.insert("user", {
+                "user_id": generate_id(),
+                key: f"indexunique{key}"
+            })
+
+            with self.assertRaises(DetailsExistError):
+                await self.handler._db_wrapper.insert("user", {
+                    "user_id": generate_id(),
+                    key: f"indexunique{key}"
+                })
+
+        # Users without a name or email don't conflict.
+        for _ in range(2):
+            await self.handler._db_wrapper.insert("user", {
+                "user_id": generate_id()
+            })
+
+    async def test_concurrent_start(self) -> None:
+        if USE_MEMORY:
+            self.skipTest("Memory engines don't share a database.")
+
+        # Workers starting together all find the tables missing.
+        if self.use_sql:
+            for table in (schema_table, outbox_table, user_table):
+                await self.handler._db.execute(DropTable(table))
+        else:
+            for collection in ("user", "outbox"):
+                await self.handler._db.drop_collection(collection)
+
+        handlers = [AccountHandler(self.engine()) for _ in range(4)]
+        try:
+            await asyncio.gather(*[handler.start() for handler in handlers])
+        finally:
+            await asyncio.gather(*[handler.close() for handler in handlers])
+
+        await self.test_unique()
+
+
+class TestIndexesMongo(TestIndexes):
+    use_sql = False
@@ -0,0 +1,110 @@
+from .base import TestBase
+from .. import Sessions, SessionInvalid
+
+
+class TestSessions(TestBase):
+    use_sql = True
+    use_smtp = False
+    handler_kwargs = {
+        "sessions": Sessions(key=b"hMz2m5qVtK8xW3pL")
+    }
+
+    valid_password = "S]Q}67=uLetG{r,_8{"
+
+    async def test_verify(self) -> None:
+        model, _ = await self.handler.create_account(
+            password=self.valid_password,
+            name="sessionuser"
+        )
+
+        _, _, token = await self.handler.login_session(
+            password=self.valid_password,
+            name=model.name
+        )
+
+        user = await self.handler.verify_session(token)
+        self.assertEqual(user.user_id, model.user_id)
+
+        self.handler._sessions._forget()
+
+        user = await self.handler.verify_session(token)
+        self.assertEqual(user.user_id, model.user_id)
+
+    async def test_tampered(self) -> None:
+        model, _ = await self.handler.create_account(
+            password=self.valid_password,
+            name="sessiontamper"
+        )
+
+        _, _, token = await self.handler.login_session(
+            password=self.valid_password,
+            name=model.name
+        )
+
+        with self.assertRaises(SessionInvalid):
+            await self.handler.verify_session(token[:-1])
+
+        with self.assertRaises(SessionInvalid):
+            await self.handler.verify_session("notatoken")
+
+    async def test_revoked(self) -> None:
+        model, user = await self.handler.create_account(
+            password=self.valid_password,
+            name="sessionrevoke"
+        )
+
+        _, _, token = await self.handler.login_session(
+            password=self.valid_password,
+            name=model.name
+        )
+
+        await user.revoke_sessions()
+
+        with self.assertRaises(SessionInvalid):
+            await self.handler.verify_session(token)
+
+        _, _, token = await self.handler.login_session(
+            password=self.valid_password,
+            name=model.name
+        )
+
+        await user.update_password(
+            self.valid_password, self.valid_password + "1"
+        )
+
+        with self.assertRaises(SessionInvalid):
+            await self.handler.verify_session(token)
+
+    async def test_revoked_elsewhere(self) -> None:
+        model, user = await self.handler.create_account(
+            password=self.valid_password,
+            name="sessionelsewhere"
+        )
+
+        _, _, token = await self.handler.login_session(
+            password=self.valid_password,
+            name=model.name
+        )
+
+        # Revoked as another process would, without forgetting
+        # this process' cached counter.
+        await self.handler._db_wrapper.increment(
+            "user", {"user_id": user.user_id}, "session_counter"
+        )
+
+        # Accepted until the cached counter expires.
+        self.assertEqual(
+            (await self.handler.verify_session(token)).user_id,
+            user.user_id
+        )
+
+        self.handler._sessions = Sessions(
+            key=b"hMz2m5qVtK8xW3pL", counter_ttl=0.0
+        )
+        with self.assertRaises(SessionInvalid):
+            await self.handler.verify_session(token)
+        self.assertEqual(len(self.handler._sessions), 0)
+
+
+class TestSessionsMongo(TestSessions):
+    use_sql = False
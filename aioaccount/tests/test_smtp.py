@@ -0,0 +1,238 @@
+import asyncio
+import os
+import tempfile
+import aiosmtplib
+
+from time import monotonic
+from typing import List
+from unittest import mock
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from .base import TestBase
+from .args import SMTP_SETTINGS
+from .. import SmtpClient, SmtpHtml, SmtpNotStarted
+
+
+class TestSmtp(TestBase):
+    use_memory = True
+    use_smtp = True
+
+    async def enqueue(self, smtp: SmtpClient,
+                      amount: int) -> List[asyncio.Future]:
+        loop = asyncio.get_event_loop()
+
+        sending = []
+        for index in range(amount):
+            sent = loop.create_future()
+            await smtp._enqueue(
+                f"queued{index}@example.com", "code", "confirm", sent
+            )
+            sending.append(sent)
+
+        return sending
+
+    async def test_enqueue_not_started(self) -> None:
+        smtp = SmtpClient(**SMTP_SETTINGS)
+
+        with self.assertRaises(SmtpNotStarted):
+            await smtp._enqueue("notstarted@example.com", "code", "confirm")
+
+        await smtp.start()
+        await smtp.close()
+
+        with self.assertRaises(SmtpNotStarted):
+            await smtp._enqueue("closed@example.com", "code", "confirm")
+
+    async def test_start_twice(self) -> None:
+        smtp = SmtpClient(**SMTP_SETTINGS, senders=2)
+
+        await smtp.start()
+        senders = list(smtp._senders)
+        await smtp.start()
+
+        self.assertEqual(smtp._senders, senders)
+
+        await smtp.close()
+        for sender in senders:
+            self.assertTrue(sender.done())
+
+    async def test_rate_limit(self) -> None:
+        smtp = SmtpClient(**SMTP_SETTINGS, rate=20.0, burst=1)
+        await smtp.start()
+
+        started = monotonic()
+        self.assertTrue(all(
+            await asyncio.gather(*await self.enqueue(smtp, 5))
+        ))
+
+        # The first email uses the burst, the other 4 wait
+        # 1 / 20 seconds each.
+        self.assertGreaterEqual(monotonic() - started, 0.18)
+        self.assertEqual(smtp.sent, 5)
+
+        await smtp.close()
+
+    async def test_retry_then_give_up(self) -> None:
+        # Nothing listens on port 1, so every attempt fails.
+        smtp = SmtpClient(
+            SMTP_SETTINGS["host"], 1, SMTP_SETTINGS["email"],
+            retries=2, retry_delay=0.01
+        )
+        await smtp.start()
+
+        loop = asyncio.get_event_loop()
+        reported = []
+        loop.set_exception_handler(lambda _, context: reported.append(context))
+        try:
+            self.assertEqual(
+                await asyncio.gather(*await self.enqueue(smtp, 1)), [False]
+            )
+        finally:
+            loop.set_exception_handler(None)
+
+        self.assertEqual(smtp.retried, 2)
+        self.assertEqual(smtp.failed, 1)
+        self.assertEqual(smtp.sent, 0)
+        self.assertEqual(len(reported), 1)
+
+        await smtp.close()
+
+    async def test_close_drains(self) -> None:
+        smtp = SmtpClient(**SMTP_SETTINGS)
+        await smtp.start()
+
+        sending = await self.enqueue(smtp, 5)
+        await smtp.close(timeout=10.0)
+
+        self.assertEqual([sent.result() for sent in sending], [True] * 5)
+        self.assertEqual(smtp.pending, 0)
+        self.assertEqual(smtp.sent, 5)
+
+    async def test_close_timeout(self) -> None:
+        smtp = SmtpClient(
+            SMTP_SETTINGS["host"], 1, SMTP_SETTINGS["email"],
+            retries=1, retry_delay=60.0
+        )
+        await smtp.start()
+
+        loop = asyncio.get_event_loop()
+        loop.set_exception_handler(lambda _, context: None)
+        try:
+            sending = await self.enqueue(smtp, 1)
+
+            started = monotonic()
+            await smtp.close(timeout=0.1)
+        finally:
+            loop.set_exception_handler(None)
+
+        # Emails still queued are dropped rather then waited on.
+        self.assertLess(monotonic() - started, 5.0)
+        self.assertEqual(sending[0].result(), False)
+
+    async def test_pool_reuse(self) -> None:
+        smtp = SmtpClient(**SMTP_SETTINGS)
+
+        await smtp._send("reuse@example.com", "code", "confirm")
+        self.assertEqual(len(smtp._idle), 1)
+        _, connection = smtp._idle[0]
+
+        await smtp._send("reuse@example.com", "code", "confirm")
+        self.assertEqual(len(smtp._idle), 1)
+        self.assertIs(smtp._idle[0][1], connection)
+
+        await smtp.close()
+
+    async def test_pool_broken_discarded(self) -> None:
+        smtp = SmtpClient(**SMTP_SETTINGS)
+
+        await smtp._send("broken@example.com", "code", "confirm")
+        _, broken = smtp._idle[0]
+
+        async def send_message(*args, **kwargs) -> None:
+            raise ConnectionError()
+
+        broken.send_message = send_message
+
+        # Retried once on a new connection.
+        await smtp._send("broken@example.com", "code", "confirm")
+
+        self.assertFalse(broken.is_connected)
+        self.assertEqual(len(smtp._idle), 1)
+        self.assertIsNot(smtp._idle[0][1], broken)
+
+        await smtp.close()
+
+    async def test_pool_size(self) -> None:
+        smtp = SmtpClient(**SMTP_SETTINGS, pool_size=2)
+
+        created = []
+        connect = aiosmtplib.SMTP
+
+        def record(**kwargs) -> aiosmtplib.SMTP:
+            connection = connect(**kwargs)
+            created.append(connection)
+            return connection
+
+        with mock.patch.object(aiosmtplib, "SMTP", record):
+            await asyncio.gather(*[
+                smtp._send(f"pool{index}@example.com", "code", "confirm")
+                for index in range(6)
+            ])
+
+        self.assertEqual(len(created), 2)
+        self.assertEqual(len(smtp._idle), 2)
+
+        await smtp.close()
+
+    async def test_layouts(self) -> None:
+        with tempfile.TemporaryDirectory() as path:
+            with open(os.path.join(path, "email.html"), "w") as file:
+                file.write('<a href="{{ url }}">Confirm {{ url }}</a>')
+
+            # Rendered as templates were before being precompiled.
+            expected = Environment(
+                loader=FileSystemLoader(path),
+                autoescape=select_autoescape(["html", "xml"])
+            ).get_template("email.html").render(
+                {"url": "https://example.com/confirm/code?next=<a>"}
+            )
+
+            for enable_async in (False, True):
+                html = SmtpHtml(path, "email.html", enable_async=enable_async)
+
+                with mock.patch.object(
+                        html._jinja2, "get_template",
+                        wraps=html._jinja2.get_template) as get_template:
+                    smtp = SmtpClient(**SMTP_SETTINGS).confirm_layout(
+                        "https://example.com/confirm/{validation_code}",
+                        html=html
+                    ).reset_layout(
+                        "https://example.com/reset?code=",
+                        raw="Reset with {link}",
+                        subject="Reset"
+                    )
+
+                    messages = []
+
+                    async def deliver(message) -> None:
+                        messages.append(message)
+
+                    smtp._deliver = deliver
+
+                    for _ in range(2):
+                        await smtp._send(
+                            "layout@example.com", "code?next=<a>", "confirm"
+                        )
+                    await smtp._send("layout@example.com", "code", "reset")
+
+                self.assertEqual(get_template.call_count, 1)
+
+                confirm, _, reset = messages
+                self.assertEqual(
+                    confirm.get_payload(decode=True).decode(), expected
+                )
+                self.assertEqual(
+                    reset.get_content().strip(),
+                    "Reset with https://example.com/reset?code=code"
+                )
+                self.assertEqual(reset["Subject"], "Reset")
@@ -0,0 +1,75 @@
+from .base import TestBase
+from .. import AccountDetailsError
+
+
+class TestUpdateUsers(TestBase):
+    use_sql = True
+
+    valid_password = "#!K2&33?e%@Pv3_Q"
+
+    async def test_update_users(self) -> None:
+        users = []
+        for name in ("bulkupone", "bulkuptwo"):
+            _, user = await self.handler.create_account(
+                password=self.valid_password,
+                name=name
+            )
+            users.append(user)
+
+        self.assertEqual(
+            await self.handler.update_users(
+                {"email_confirmed": True},
+                user_ids=[user.user_id for user in users]
+            ),
+            2
+        )
+
+        for user in users:
+            self.assertTrue((await user.get()).email_confirmed)
+
+    async def test_update_users_unconfirmed(self) -> None:
+        for name in ("bulkunone", "bulkuntwo"):
+            await self.handler.create_account(
+                password=self.valid_password,
+                name=name
+            )
+
+        unconfirmed = await self.handler.count_users(email_confirmed=False)
+        self.assertGreaterEqual(unconfirmed, 2)
+
+        # Matches the same users as count_users does.
+        self.assertEqual(
+            await self.handler.update_users(
+                {"email_confirmed": True},
+                filter_={"email_confirmed": False}
+            ),
+            unconfirmed
+        )
+        self.assertEqual(
+            await self.handler.count_users(email_confirmed=False), 0
+        )
+
+    async def test_update_users_invalid_column(self) -> None:
+        for values in ({"name": "bulkname"}, {"session_counter": 0},
+                       {"password_reset_code": "code"},
+                       {"not_a_column": True}, {}):
+            with self.assertRaises(AccountDetailsError):
+                await self.handler.update_users(
+                    values,
+                    filter_={"email_confirmed": True}
+                )
+
+    async def test_update_users_invalid_filter(self) -> None:
+        for filter_ in ({"email_vaildate": "code"}, {"not_a_column": True}):
+            with self.assertRaises(AccountDetailsError):
+                await self.handler.update_users(
+                    {"email_confirmed": True},
+                    filter_=filter_
+                )
+
+            with self.assertRaises(AccountDetailsError):
+                await self.handler.delete_users(filter_=filter_)
+
+
+class TestUpdateUsersMongo(TestUpdateUsers):
+    use_sql = False
@@ -1,5 +1,7 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
 from .base import TestBase
-from .. import UserModel, User
+from .. import UserModel, User, AccountDetailsError, UserStats
 
 
 class TestUsers(TestBase):
@@ -17,6 +19,153 @@ class TestUsers(TestBase):
             self.assertIsInstance(model, UserModel)
             self.assertIsInstance(user, User)
 
+    async def test_users_page(self) -> None:
+        for name in ("pageone", "pagetwo", "pagethree"):
+            await self.handler.create_account(
+                password=self.valid_password,
+                name=name
+            )
+
+        user_ids = []
+        cursor = None
+        while True:
+            page, cursor = await self.handler.users_page(
+                limit=2, cursor=cursor
+            )
+            self.assertLessEqual(len(page), 2)
+
+            for model, user in page:
+                self.assertIsInstance(model, UserModel)
+                self.assertIsInstance(user, User)
+                user_ids.append(model.user_id)
+
+            if not cursor:
+                break
+
+        self.assertEqual(user_ids, sorted(user_ids))
+        self.assertEqual(len(user_ids), len(set(user_ids)))
+
+    async def test_users_page_invalid_limit(self) -> None:
+        for limit in (0, -1):
+            with self.assertRaises(AccountDetailsError):
+                await self.handler.users_page(limit=limit)
+
+    async def test_users_page_invalid_cursor(self) -> None:
+        with self.assertRaises(AccountDetailsError):
+            await self.handler.users_page(cursor="notacursor")
+
+    async def test_users_page_tampered_cursor(self) -> None:
+        for name in ("tamperone", "tampertwo"):
+            await self.handler.create_account(
+                password=self.valid_password,
+                name=name
+            )
+
+        _, cursor = await self.handler.users_page(limit=1)
+        self.assertIsNotNone(cursor)
+
+        # Cursors for the other direction, without a direction
+        # or what aren't UTF-8 are rejected.
+        for tampered in (b"d" + urlsafe_b64decode(cursor)[1:],
+                         b"nodirection", b"\xff\xfe:a"):
+            with self.assertRaises(AccountDetailsError):
+                await self.handler.users_page(
+                    limit=1, cursor=urlsafe_b64encode(tampered).decode()
+                )
+
+        with self.assertRaises(AccountDetailsError):
+            await self.handler.users_page(limit=1, cursor=cursor[:-1])
+
+    async def test_user_ids(self) -> None:
+        for name in ("idsone", "idstwo", "idsthree"):
+            await self.handler.create_account(
+                password=self.valid_password,
+                name=name
+            )
+
+        user_ids = []
+        async for batch in self.handler.user_ids(batch_size=2):
+            self.assertLessEqual(len(batch), 2)
+            user_ids += batch
+
+        self.assertGreaterEqual(len(user_ids), 3)
+        self.assertEqual(len(user_ids), len(set(user_ids)))
+        for user_id in user_ids:
+            self.assertIsInstance(user_id, str)
+
+    async def test_user_rows(self) -> None:
+        await self.handler.create_account(
+            password=self.valid_password,
+            name="rowsone"
+        )
+
+        async for batch in self.handler.user_rows(("user_id", "name")):
+            for row in batch:
+                self.assertIsInstance(row, tuple)
+                self.assertEqual(len(row), 2)
+
+        async for batch in self.handler.user_rows(("name",), as_dict=True):
+            for row in batch:
+                self.assertEqual(list(row), ["name"])
+
+        with self.assertRaises(AccountDetailsError):
+            async for _ in self.handler.user_rows(("password",)):
+                pass
+
+    async def test_count_users(self) -> None:
+        before = await self.handler.count_users()
+
+        await self.handler.create_account(
+            password=self.valid_password,
+            name="countone"
+        )
+
+        self.assertEqual(await self.handler.count_users(), before + 1)
+        self.assertEqual(
+            await self.handler.count_users(email_confirmed=True) +
+            await self.handler.count_users(email_confirmed=False),
+            before + 1
+        )
+
+    async def test_stats(self) -> None:
+        _, user = await self.handler.create_account(
+            password=self.valid_password,
+            name="statsone"
+        )
+        await user.reset_password()
+
+        stats = await self.handler.stats()
+        self.assertIsInstance(stats, UserStats)
+        self.assertEqual(stats.total, await self.handler.count_users())
+        self.assertEqual(stats.confirmed + stats.unconfirmed, stats.total)
+        self.assertGreaterEqual(stats.pending_resets, 1)
+
+    async def test_count_unconfirmed(self) -> None:
+        await self.handler.create_account(
+            password=self.valid_password,
+            name="unconfirmednoemail"
+        )
+        await self.handler.create_account(
+            password=self.valid_password,
+            email="unconfirmedpending@example.com"
+        )
+
+        stats = await self.handler.stats()
+        self.assertEqual(
+            await self.handler.count_users(email_confirmed=False),
+            stats.unconfirmed
+        )
+
+        unconfirmed = 0
+        async for _ in self.handler.users(email_confirmed=False):
+            unconfirmed += 1
+        self.assertEqual(unconfirmed, stats.unconfirmed)
+
 
 class TestUsersMongo(TestUsers):
     use_sql = False
+
+
+class TestUsersSqlSmtp(TestUsers):
+    use_sql = True
+    use_smtp = True
@@ -0,0 +1,77 @@
+import argparse
+import json
+import sys
+
+from typing import Dict, List, Tuple
+
+METRICS = ("mean", "p50", "p90", "p99", "max", "ops_per_second")
+
+
+def load(path: str) -> Dict[Tuple[str, int, str], dict]:
+    with open(path, "r") as file:
+        results = json.load(file)["results"]
+
+    return {
+        (result["engine"], result["users"], result["operation"]): result
+        for result in results
+    }
+
+
+def value(result: dict, metric: str) -> float:
+    if metric == "ops_per_second":
+        return result["ops_per_second"]
+
+    return result["latency"][metric]
+
+
+def compare(baseline: Dict[Tuple[str, int, str], dict],
+            current: Dict[Tuple[str, int, str], dict],
+            metric: str, threshold: float) -> List[Tuple[tuple, float, bool]]:
+    """Changes of results within both runs, positive changes
+       are slower.
+
+    Returns
+    -------
+    List[Tuple[tuple, float, bool]]
+        Key, change & if the change is a regression.
+    """
+
+    changes = []
+    for key in sorted(baseline.keys() & current.keys()):
+        before = value(baseline[key], metric)
+        after = value(current[key], metric)
+
+        if metric == "ops_per_second":
+            change = before / after - 1 if after else float("inf")
+        else:
+            change = after / before - 1 if before else 0.0
+
+        changes.append((key, change, change > threshold))
+
+    return changes
+
+
+cli = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+cli.add_argument("baseline", type=str)
+cli.add_argument("current", type=str)
+cli.add_argument("--metric", choices=METRICS, default="p50")
+cli.add_argument("--threshold", type=float, default=0.1,
+                 help="Slowdown flagged as a regression, 0.1 being 10%%.")
+
+if __name__ == "__main__":
+    args = cli.parse_args()
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+
+    regressions = 0
+    for (engine, users, operation), change, regressed in compare(
+            baseline, current, args.metric, args.threshold):
+        regressions += regressed
+        print(f"{'REGRESSION' if regressed else 'ok':<10} {engine:<7} "
+              f"{users:>8} {operation:<17} {change:+.1%}")
+
+    for key in sorted(baseline.keys() ^ current.keys()):
+        print(f"{'missing':<10} {key[0]:<7} {key[1]:>8} {key[2]}")
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,350 @@
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+
+from datetime import datetime
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List
+
+from aioaccount import (
+    __version__,
+    AccountHandler,
+    BcryptHasher,
+    Database,
+    EmailValidator,
+    MemoryEngine,
+    SQLEngine,
+    User
+)
+
+PASSWORD = "#!K2&33?e%@Pv3_Q"
+NEW_PASSWORD = "#!K2&33?e%@Pv3_R"
+
+ENGINES = ("sqlite", "memory")
+OPERATIONS = (
+    "to_user",
+    "user_get",
+    "login",
+    "users",
+    "confirm_email",
+    "password_confirm",
+    "create_account"
+)
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    """Nearest rank percentile of sorted values.
+    """
+
+    return ordered[max(0, math.ceil(len(ordered) * percent / 100) - 1)]
+
+
+def summarize(latencies: List[float], operations: int,
+              elapsed: float) -> dict:
+    """Throughput & latency of timed calls, zeros when nothing
+       was timed.
+    """
+
+    if not latencies:
+        return {
+            "iterations": 0,
+            "ops_per_second": 0.0,
+            "latency": {
+                metric: 0.0 for metric in ("mean", "p50", "p90", "p99", "max")
+            }
+        }
+
+    ordered = sorted(latencies)
+    return {
+        "iterations": len(latencies),
+        "ops_per_second": operations / elapsed,
+        # Milliseconds.
+        "latency": {
+            "mean": statistics.mean(ordered) * 1000,
+            "p50": percentile(ordered, 50) * 1000,
+            "p90": percentile(ordered, 90) * 1000,
+            "p99": percentile(ordered, 99) * 1000,
+            "max": ordered[-1] * 1000
+        }
+    }
+
+
+async def measure(calls: List[Callable[[], Awaitable]]) -> dict:
+    """Times calls one after another, the first tenth warm caches
+       & aren't timed. Garbage collection is paused while timing,
+       as timeit does.
+    """
+
+    warmup = len(calls) // 10
+    for call in calls[:warmup]:
+        await call()
+
+    latencies = []
+    gc.collect()
+    gc.disable()
+    try:
+        start = perf_counter()
+        for call in calls[warmup:]:
+            called = perf_counter()
+            await call()
+            latencies.append(perf_counter() - called)
+        elapsed = perf_counter() - start
+    finally:
+        gc.enable()
+
+    return summarize(latencies, len(latencies), elapsed)
+
+
+def name(index: int) -> str:
+    return f"user{index}"
+
+
+def email(index: int) -> str:
+    return f"user{index}@example.com"
+
+
+async def seed(handler: AccountHandler, users: int) -> None:
+    # A single hash is shared, hashing a million passwords
+    # would take longer then the benchmarks.
+    hashed = (await handler._hash_password(PASSWORD)).decode()
+
+    async for result in handler.create_accounts((
+            {
+                "password": hashed,
+                "name": name(index),
+                "email": email(index),
+                "email_confirmed": True
+            } for index in range(users)
+    ), batch_size=1000, prehashed=True):
+        if result.error:
+            raise result.error
+
+
+async def bench_to_user(handler: AccountHandler,
+                        targets: List[int]) -> dict:
+    return await measure([
+        lambda index=index: handler.to_user(email=email(index))
+        for index in targets
+    ])
+
+
+async def bench_user_get(handler: AccountHandler,
+                         targets: List[int]) -> dict:
+    users = [
+        (await handler.to_user(email=email(index)))[1] for index in targets
+    ]
+    return await measure([user.get for user in users])
+
+
+async def bench_login(handler: AccountHandler,
+                      targets: List[int]) -> dict:
+    return await measure([
+        lambda index=index: handler.login(PASSWORD, name=name(index))
+        for index in targets
+    ])
+
+
+async def bench_users(handler: AccountHandler, passes: int) -> dict:
+    async def iterate() -> None:
+        async for _ in handler.users():
+            pass
+
+    await iterate()
+
+    latencies = []
+    gc.collect()
+    gc.disable()
+    try:
+        start = perf_counter()
+        for _ in range(passes):
+            called = perf_counter()
+            await iterate()
+            latencies.append(perf_counter() - called)
+        elapsed = perf_counter() - start
+    finally:
+        gc.enable()
+
+    # Throughput is users yielded per second, latency is per pass.
+    return summarize(
+        latencies, passes * await handler.count_users(), elapsed
+    )
+
+
+async def bench_confirm_email(handler: AccountHandler,
+                              targets: List[int]) -> dict:
+    codes = {}
+    for index in targets:
+        _, user = await handler.to_user(email=email(index))
+        code, values = handler._email_regenerate()
+        await handler._db_wrapper.update(
+            "user", {"user_id": user.user_id}, values
+        )
+        codes[index] = code
+
+    return await measure([
+        lambda index=index: handler.confirm_email(email(index), codes[index])
+        for index in targets
+    ])
+
+
+async def bench_password_confirm(handler: AccountHandler,
+                                 targets: List[int]) -> dict:
+    resets = []  # type: List[tuple]
+    for index in targets:
+        _, user = await handler.to_user(email=email(index))
+        resets.append((user, await user.reset_password()))
+
+    def call(user: User, code: str) -> Callable[[], Awaitable]:
+        return lambda: user.password_confirm(NEW_PASSWORD, code)
+
+    return await measure([call(user, code) for user, code in resets])
+
+
+async def bench_create_account(handler: AccountHandler,
+                               targets: List[int]) -> dict:
+    return await measure([
+        lambda index=index: handler.create_account(
+            PASSWORD, name=f"created{index}",
+            email=f"created{index}@example.com"
+        )
+        for index in targets
+    ])
+
+
+async def run(engine: str, users: int, options: argparse.Namespace,
+              directory: str) -> Dict[str, dict]:
+    if engine == "sqlite":
+        path = os.path.join(directory, f"{users}.db")
+        storage = SQLEngine(Database(f"sqlite:///{path}"))
+    else:
+        storage = MemoryEngine()
+
+    handler = AccountHandler(
+        storage,
+        hasher=BcryptHasher(rounds=options.rounds),
+        email_validator=EmailValidator(check_deliverability=False)
+    )
+    await handler.start()
+
+    results = {}
+    try:
+        started = perf_counter()
+        await seed(handler, users)
+        print(f"{engine} {users} users seeded in "
+              f"{perf_counter() - started:.1f}s", file=sys.stderr)
+
+        rng = random.Random(f"{options.seed}:{users}")
+        # Every operation gets its own users, so operations
+        # changing users don't effect each other.
+        chosen = rng.sample(
+            range(users), min(users, options.iterations * len(OPERATIONS))
+        )
+
+        for position, operation in enumerate(OPERATIONS):
+            if operation not in options.operations:
+                continue
+
+            targets = chosen[position::len(OPERATIONS)]
+            if operation != "users" and not targets:
+                # Fewer users then operations, nothing to time.
+                print(f"{engine} {users} {operation}: skipped, "
+                      "no users left", file=sys.stderr)
+                continue
+
+            if operation == "users":
+                result = await bench_users(handler, options.passes)
+            else:
+                result = await globals()[f"bench_{operation}"](
+                    handler, targets
+                )
+
+            results[operation] = result
+            print(f"{engine} {users} {operation}: "
+                  f"{result['ops_per_second']:.0f} ops/s, "
+                  f"p50 {result['latency']['p50']:.3f}ms, "
+                  f"p99 {result['latency']['p99']:.3f}ms", file=sys.stderr)
+    finally:
+        await handler.close()
+
+    return results
+
+
+async def main(options: argparse.Namespace) -> dict:
+    output = {
+        "meta": {
+            "aioaccount": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now().isoformat(),
+            "seed": options.seed,
+            "iterations": options.iterations,
+            "passes": options.passes,
+            "rounds": options.rounds
+        },
+        "results": []
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for engine in options.engines:
+            for users in options.users:
+                for operation, result in (await run(
+                        engine, users, options, directory)).items():
+                    output["results"].append({
+                        "engine": engine,
+                        "users": users,
+                        "operation": operation,
+                        **result
+                    })
+
+    return output
+
+
+def positive(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} must be at least 1")
+
+    return number
+
+
+def rounds(value: str) -> int:
+    number = int(value)
+    if not 4 <= number <= 31:
+        raise argparse.ArgumentTypeError(f"{value} must be within 4 & 31")
+
+    return number
+
+
+cli = argparse.ArgumentParser(prog="python -m benchmarks.run")
+cli.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+cli.add_argument("--users", nargs="+", type=positive, default=[1000, 10000],
+                 help="Dataset sizes, e.g. 1000 10000 100000 1000000.")
+cli.add_argument("--operations", nargs="+", choices=OPERATIONS,
+                 default=OPERATIONS)
+cli.add_argument("--iterations", type=positive, default=200,
+                 help="Calls per operation, the first tenth untimed.")
+cli.add_argument("--passes", type=positive, default=3,
+                 help="Full iterations of users() timed, after one "
+                      "untimed pass.")
+cli.add_argument("--rounds", type=rounds, default=4,
+                 help="Bcrypt rounds, low so the library is measured "
+                      "rather then bcrypt.")
+cli.add_argument("--seed", type=int, default=0)
+cli.add_argument("--output", type=str, default="benchmark.json")
+
+if __name__ == "__main__":
+    args = cli.parse_args()
+
+    results = asyncio.get_event_loop().run_until_complete(main(args))
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=4)
+
+    print(f"Results written to {args.output}", file=sys.stderr)